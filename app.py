@@ -1,32 +1,96 @@
 from flask_cors import CORS
-from flask import Flask, jsonify, request
+from flask import Flask, g, jsonify, request, stream_with_context
 from apscheduler.schedulers.background import BackgroundScheduler
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
-from datetime import datetime
+from flask_migrate import Migrate, stamp, upgrade
+from datetime import datetime, timedelta
 from src.services.major_courses import get_all_major_courses
-from src.services.ucsc_courses import get_courses
+from src.services.ucsc_courses import stream_courses
+from src.services import pisa_http
+from src.services.course_sync import (
+    SECTION_FIELDS,
+    SuspiciousResult,
+    SyncResult,
+    course_to_row,
+    diff_sections,
+    plausible_result,
+    rows_digest,
+    section_key,
+)
+from src.services.snapshot import CourseSnapshot, TermSnapshots
+from src.services.response_cache import CachedResponse, ResponseCache, serialize
+from src.services.course_index import CourseIndex, decode_cursor, encode_cursor, normalize_course_code, sections_by_course
+from src.services.schedule import parse_time
+from src.services.schedule_mask import ScheduleMasks, parse_busy
+from src.services.search_index import SearchIndex
+from src.services.degree_sync import diff_requirements, requirement_rows
+from src.services.degree_cache import DegreeReadModel
+from src.services.refresh_scheduler import AdaptiveRefreshScheduler, RefreshPolicy
+from src.services.leader import LeaderLock
+from src.services.change_feed import GenerationNotifier, compact_changes, sse_event
+from src.services.metrics import REQUEST_SECONDS, exposition, record_sync
+from src.services.profiler import profile_once
+from src.services.enrollment_history import (
+    append_sample,
+    decode_samples,
+    downsample,
+    encode_samples,
+    estimate_open,
+    fill_curve,
+    new_history,
+    parse_class_count,
+)
+from sqlalchemy import delete, event, func, insert, inspect, select, update
+from sqlalchemy.engine import Engine
+import bisect
+import functools
+import json
+import os
 import pytz
-import concurrent.futures
+import sqlite3
+import threading
+import time
 
 app = Flask(__name__)
 CORS(app)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///courses.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///courses.db')
 db = SQLAlchemy(app)
-migrate = Migrate(app, db)
+migrate = Migrate(app, db, directory=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations'))
 class Degree(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), unique=True, nullable=False)
     courses = db.relationship('Course', backref='degree', lazy=True)
 
 class Course(db.Model):
+    __table_args__ = (
+        db.UniqueConstraint('degree_id', 'course_type', 'course_code', name='uq_course_degree_type_code'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     course_code = db.Column(db.String(1000), nullable=False)
     course_type = db.Column(db.String(50), nullable=False)
     degree_id = db.Column(db.Integer, db.ForeignKey('degree.id'), nullable=False)
+    position = db.Column(db.Integer, nullable=False, default=0)  # catalog order within the degree
+
+class CatalogSync(db.Model):
+    # One row per update_all_courses run that changed the degree requirements
+    id = db.Column(db.Integer, primary_key=True)
+    created_at = db.Column(db.DateTime, nullable=False)
+    degrees = db.Column(db.Integer, nullable=False)
+    degrees_added = db.Column(db.Integer, nullable=False, default=0)
+    inserted = db.Column(db.Integer, nullable=False, default=0)
+    updated = db.Column(db.Integer, nullable=False, default=0)
+    deleted = db.Column(db.Integer, nullable=False, default=0)
+
+class Term(db.Model):
+    # A quarter as listed in the class search term dropdown, e.g. 2248 (Fall 2024)
+    code = db.Column(db.String(4), primary_key=True)
+    name = db.Column(db.String(50))
+    frozen = db.Column(db.Boolean, nullable=False, default=False)  # finished: served as stored, never rescraped
+    added_at = db.Column(db.DateTime)
 
 class CourseModel(db.Model):
     id = db.Column(db.Integer, primary_key=True)
+    term = db.Column(db.String(4), index=True)
     ge = db.Column(db.String(5))
     code = db.Column(db.String(10))
     name = db.Column(db.String(30))
@@ -37,142 +101,1140 @@ class CourseModel(db.Model):
     class_type = db.Column(db.String(19))
     schedule= db.Column(db.String(25))
     location = db.Column(db.String(20))
-    timestamp = db.Column(db.DateTime, default=datetime.now(tz=pytz.utc))
+    # Callables, so each row gets the time it was written rather than the import time
+    timestamp = db.Column(db.DateTime, default=lambda: datetime.now(tz=pytz.utc), onupdate=lambda: datetime.now(tz=pytz.utc))
+
+class Snapshot(db.Model):
+    # One row per published generation of a term's section table. Ids are
+    # shared by all terms, so a generation is never reused.
+    id = db.Column(db.Integer, primary_key=True)
+    term = db.Column(db.String(4), index=True)
+    created_at = db.Column(db.DateTime, nullable=False)
+    row_count = db.Column(db.Integer, nullable=False)
+    inserted = db.Column(db.Integer, nullable=False, default=0)
+    updated = db.Column(db.Integer, nullable=False, default=0)
+    deleted = db.Column(db.Integer, nullable=False, default=0)
+
+class CategoryCheckpoint(db.Model):
+    # Last good scrape of each GE category, and how its recent attempts went
+    term = db.Column(db.String(4), primary_key=True)
+    ge = db.Column(db.String(5), primary_key=True)
+    row_count = db.Column(db.Integer, nullable=False, default=0)
+    digest = db.Column(db.String(40))
+    succeeded_at = db.Column(db.DateTime)
+    attempted_at = db.Column(db.DateTime)
+    failures = db.Column(db.Integer, nullable=False, default=0)  # in a row
+    last_error = db.Column(db.String(200))
+    rejected_count = db.Column(db.Integer)  # size of the last result held back as too small
+    rejections = db.Column(db.Integer, nullable=False, default=0)
+
+class EnrollmentHistory(db.Model):
+    # Seat-count samples for one section, appended only when the counts change.
+    # times/opens/totals are delta-encoded varint arrays (see enrollment_history).
+    term = db.Column(db.String(4), primary_key=True)  # class numbers are reused across terms
+    enroll_num = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    start = db.Column(db.Integer, nullable=False)  # epoch seconds of the first sample
+    times = db.Column(db.LargeBinary, nullable=False)
+    opens = db.Column(db.LargeBinary, nullable=False)
+    totals = db.Column(db.LargeBinary, nullable=False)
+    last_time = db.Column(db.Integer, nullable=False)
+    last_open = db.Column(db.Integer, nullable=False)
+    last_total = db.Column(db.Integer, nullable=False)
+    samples = db.Column(db.Integer, nullable=False)
+
+class SectionChange(db.Model):
+    # Sections written by each snapshot generation, so clients can fetch only
+    # what changed since the version they have. Pruned with the snapshot rows.
+    id = db.Column(db.Integer, primary_key=True)
+    generation = db.Column(db.Integer, nullable=False, index=True)
+    term = db.Column(db.String(4))
+    ge = db.Column(db.String(5), nullable=False)
+    enroll_num = db.Column(db.Integer, nullable=False)
+    data = db.Column(db.Text)  # the section as JSON, NULL when it was deleted
+
+@event.listens_for(Engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets API reads proceed while a refresh transaction is writing
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
 
+@app.before_request
+def start_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def observe_latency(response):
+    # Labelled by route pattern, not path, so /api/sections/<id>/... is one series
+    started = g.pop('request_started', None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        REQUEST_SECONDS.labels(route, request.method, response.status_code).observe(time.perf_counter() - started)
+    return response
+
+
+# The schema db.create_all() built before migrations were tracked
+UNTRACKED_REVISION = '07e898b377bc'
 
 def create_db():
+    # Brings the database up to the current schema. create_all() alone
+    # cannot add columns to tables that already exist.
     with app.app_context():
-        db.create_all()
-        
+        g.startup_migration = True  # see migrations/env.py
+        tables = inspect(db.engine).get_table_names()
+        if not tables:
+            db.create_all()
+            stamp()
+            return
+        if 'alembic_version' not in tables:
+            stamp(revision=UNTRACKED_REVISION)
+        upgrade()
 
-last_update_time = None
 
 def get_last_update():
-    global last_update_time
-    if last_update_time is None:
+    # Read from the database so every worker, and a restarted one, agrees:
+    # the latest of the last published snapshot and the last good scrape
+    snapshot = requested_snapshot()
+    succeeded_at = (
+        db.session.query(func.max(CategoryCheckpoint.succeeded_at))
+        .filter(CategoryCheckpoint.term == snapshot.term)
+        .scalar()
+    )
+    times = [t for t in (snapshot.created_at, succeeded_at) if t is not None]
+    if times:
+        last_update_time = max(t.replace(tzinfo=None) for t in times)
+        last_update_time = pytz.utc.localize(last_update_time).astimezone(pytz.timezone('America/Los_Angeles'))
+    else:
         last_update_time = datetime.now(pytz.timezone('America/Los_Angeles'))
-    elif isinstance(last_update_time, str):
-        last_update_time = datetime.fromisoformat(last_update_time)
-    
-    return jsonify({"last_update": last_update_time.isoformat()})
 
+    return jsonify({"last_update": last_update_time.isoformat(), "version": snapshot.generation})
+
+
+def sync_degrees(all_courses):
+    # Set-based sync of degree requirements. Degrees missing from the scrape
+    # (for example because their page failed) are left untouched.
+    degree_ids = dict(db.session.execute(select(Degree.name, Degree.id)).all())
+    new_degrees = [name for name in all_courses if name not in degree_ids]
+    if new_degrees:
+        db.session.execute(insert(Degree), [{"name": name} for name in new_degrees])
+        degree_ids.update(db.session.execute(
+            select(Degree.name, Degree.id).where(Degree.name.in_(new_degrees))
+        ).all())
+
+    synced_ids = [degree_ids[name] for name in all_courses]
+    existing = {}
+    for row in db.session.execute(
+        select(Course.id, Course.degree_id, Course.course_type, Course.course_code, Course.position)
+        .where(Course.degree_id.in_(synced_ids))
+    ):
+        existing[(row.degree_id, row.course_type, row.course_code)] = (row.id, row.position)
+
+    inserts, moves, deletes = diff_requirements(existing, requirement_rows(all_courses, degree_ids))
+    # The diff only inserts keys that are not stored yet, and only the leader
+    # writes, so a plain INSERT works on any database DATABASE_URL names
+    if inserts:
+        db.session.execute(insert(Course), inserts)
+    if moves:
+        db.session.execute(update(Course), [{"id": row_id, "position": position} for row_id, position in moves])
+    if deletes:
+        db.session.execute(delete(Course).where(Course.id.in_(deletes)))
+
+    result = SyncResult(
+        inserted=len(inserts),
+        updated=len(moves),
+        deleted=len(deletes),
+        unchanged=len(existing) - len(moves) - len(deletes),
+    )
+    if result.changed or new_degrees:
+        db.session.add(CatalogSync(
+            created_at=datetime.now(pytz.utc),
+            degrees=len(all_courses),
+            degrees_added=len(new_degrees),
+            inserted=result.inserted,
+            updated=result.updated,
+            deleted=result.deleted,
+        ))
+    db.session.commit()
+
+    missing = len(degree_ids) - len(all_courses)
+    print(f"Degree requirements synced for {len(all_courses)} degrees "
+          f"({len(new_degrees)} new, {missing} not in this scrape): {result}")
+    return result
 
 def update_all_courses():
     with app.app_context():
         all_courses = get_all_major_courses()
-        
-        for degree_name, course_data in all_courses.items():
-            degree = Degree.query.filter_by(name=degree_name).first()
-            if not degree:
-                degree = Degree(name=degree_name)
-                db.session.add(degree)
-            
-            Course.query.filter_by(degree_id=degree.id).delete()
-            
-            for course_type, courses in course_data.items():
-                for course_code in courses:
-                    course = Course(course_code=course_code, course_type=course_type, degree=degree)
-                    db.session.add(course)
-        
-        db.session.commit()
+        if not all_courses:
+            print("No degree requirements scraped; keeping the existing data")
+            return
+
+        try:
+            sync_degrees(all_courses)
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error updating degree requirements: {e}")
+            return
+        load_degree_model()
         print("All courses updated successfully")
-        
-def store_courses_in_db():
-    global last_update_time
+
+degree_read_model = None
+
+def read_degree_model():
+    version = db.session.query(func.max(CatalogSync.id)).scalar() or 0
+    degrees = {}
+    rows = db.session.execute(
+        select(Degree.name, Course.course_type, Course.course_code)
+        .outerjoin(Course, Course.degree_id == Degree.id)
+        .order_by(Degree.id, Course.position, Course.id)
+    )
+    for name, course_type, course_code in rows:
+        courses = degrees.setdefault(name, [])
+        if course_code is not None:
+            courses.append((course_type, course_code))
+    return DegreeReadModel(list(degrees.items()), version)
+
+def load_degree_model():
+    global degree_read_model
+    with app.app_context():
+        degree_read_model = read_degree_model()
+    print(f"Loaded requirements for {len(degree_read_model)} degrees (version {degree_read_model.version})")
+    return degree_read_model
+
+def current_degree_model():
+    model = degree_read_model
+    return model if model is not None else load_degree_model()
+
+GE_CATEGORIES = [
+    "CC", "ER", "IM", "MF", "SI", "SR", "TA", "PE-E", "PE-H", "PE-T",
+    "PR-E", "PR-C", "PR-S", "C1", "C2"
+]
+
+# Seconds of snapshot rows, and so of the change log, kept per term. A client
+# that was current at any point in this window catches up with a delta.
+CHANGE_LOG_RETENTION = int(os.environ.get("CHANGE_LOG_RETENTION", 3600))
+
+# Terms tracked besides the one the class search has selected, and terms to
+# freeze; both comma-separated codes such as "2248,2250"
+TERMS = [code.strip() for code in os.environ.get("TERMS", "").split(",") if code.strip()]
+FROZEN_TERMS = [code.strip() for code in os.environ.get("FROZEN_TERMS", "").split(",") if code.strip()]
+# The term served by default and refreshed at full speed; the newest unfrozen term if unset
+ACTIVE_TERM = os.environ.get("ACTIVE_TERM") or None
+
+term_registry = {"active": None, "terms": {}}  # replaced as a whole by load_terms
+
+def load_terms():
+    global term_registry
+    with app.app_context():
+        terms = {term.code: term for term in Term.query.order_by(Term.code)}
+    unfrozen = [code for code, term in terms.items() if not term.frozen]
+    active = ACTIVE_TERM or (unfrozen[-1] if unfrozen else max(terms, default=None))
+    term_registry = {
+        "active": active,
+        "terms": {code: {"code": code, "name": term.name, "frozen": term.frozen} for code, term in terms.items()},
+    }
+    return term_registry
+
+def active_term():
+    return term_registry["active"]
+
+def refreshed_terms():
+    # Unfrozen terms; only the active one gets the fast refresh schedule
+    return [code for code, term in term_registry["terms"].items() if not term["frozen"]]
+
+def add_term(code, name=None, frozen=False):
+    term = db.session.get(Term, code)
+    if term is None:
+        term = Term(code=code, name=name, frozen=frozen, added_at=datetime.now(pytz.utc))
+        db.session.add(term)
+        print(f"Tracking term {code} ({name or 'unnamed'})")
+    elif name and not term.name:
+        term.name = name
+    return term
+
+def discover_terms():
+    # Adds the term the class search currently selects (a new quarter shows up
+    # here at rollover), freezes finished terms and applies TERMS/FROZEN_TERMS
+    try:
+        (code, name), offered = pisa_http.current_terms()
+    except Exception as e:
+        code, name, offered = None, None, {}
+        print(f"Could not read the current term: {e}")
+    with app.app_context():
+        if code:
+            add_term(code, name)
+        for code in TERMS:
+            add_term(code)
+        for code in FROZEN_TERMS:
+            add_term(code).frozen = True
+        if offered:
+            # A term older than the newest one listed that has dropped off the
+            # list has finished; an unlisted newer one has not started yet
+            newest = max(offered)
+            for term in Term.query.filter(Term.frozen.is_(False), Term.code < newest, Term.code.not_in(list(offered))):
+                term.frozen = True
+                print(f"Freezing term {term.code}: the class search no longer offers it")
+        db.session.commit()
+    return load_terms()
+
+def set_term_frozen(code, frozen=True):
+    with app.app_context():
+        term = add_term(code)
+        term.frozen = frozen
+        db.session.commit()
+    return load_terms()
+
+course_snapshots = TermSnapshots()
+
+def read_course_snapshot(term):
+    record = Snapshot.query.filter(Snapshot.term == term).order_by(Snapshot.id.desc()).first()
+    rows = [
+        {field: getattr(course, field) for field in SECTION_FIELDS}
+        for course in CourseModel.query.filter(CourseModel.term == term).order_by(CourseModel.id)
+    ]
+    if record is None:
+        return CourseSnapshot(0, rows, None, term)
+    return CourseSnapshot(record.id, rows, record.created_at, term)
+
+def current_course_snapshot(term=None):
+    term = term or active_term()
+    snapshot = course_snapshots.current(term)
+    if snapshot is None:
+        with app.app_context():
+            course_snapshots.publish(read_course_snapshot(term))
+        snapshot = course_snapshots.current(term)
+    return snapshot
+
+class UnknownTerm(Exception):
+    pass
+
+def requested_term():
+    # ?term=, defaulting to the active term
+    term = request.args.get('term')
+    if term is None:
+        return active_term()
+    if term not in term_registry["terms"]:
+        raise UnknownTerm(term)
+    return term
+
+def requested_snapshot():
+    return current_course_snapshot(requested_term())
+
+@app.errorhandler(UnknownTerm)
+def unknown_term(e):
+    return jsonify({"error": f"Unknown term {e}"}), 404
+
+def record_enrollment(rows, now, term):
+    # Appends a sample for every section whose seat counts moved. Runs inside
+    # the sync transaction, and only for rows the sync inserted or updated.
+    counts = {}
+    for row in rows:
+        parsed = parse_class_count(row["class_count"])
+        if parsed is not None:
+            counts[row["enroll_num"]] = parsed
+    if not counts:
+        return 0
+
+    t = int(now.timestamp())
+    histories = {
+        history.enroll_num: history
+        for history in EnrollmentHistory.query.filter(
+            EnrollmentHistory.term == term, EnrollmentHistory.enroll_num.in_(list(counts))
+        )
+    }
+    appended = 0
+    new = []
+    for enroll_num, (open_seats, total) in counts.items():
+        history = histories.get(enroll_num)
+        if history is None:
+            new.append(dict(new_history(enroll_num, t, open_seats, total), term=term))
+        elif append_sample(history, t, open_seats, total):
+            appended += 1
+    if new:
+        db.session.execute(insert(EnrollmentHistory), new)
+    return appended + len(new)
+
+def compact_enrollment_history(batch_size=500):
+    # Downsamples old samples according to HISTORY_RETENTION
+    now = int(datetime.now(pytz.utc).timestamp())
+    before = after = 0
+    with app.app_context():
+        terms = [term for (term,) in db.session.query(EnrollmentHistory.term).distinct()]
+        for term in terms:
+            last = -1
+            while True:
+                # Locked per batch, like refresh writes per category, so
+                # category writes are only held up for one batch at a time
+                with course_write_lock:
+                    histories = (
+                        EnrollmentHistory.query.filter(EnrollmentHistory.term == term, EnrollmentHistory.enroll_num > last)
+                        .order_by(EnrollmentHistory.enroll_num).limit(batch_size).all()
+                    )
+                    if not histories:
+                        db.session.rollback()
+                        break
+                    for history in histories:
+                        samples = decode_samples(history)
+                        kept = downsample(samples, now)
+                        before += len(samples)
+                        after += len(kept)
+                        if len(kept) < len(samples):
+                            for field, value in encode_samples(history.enroll_num, kept).items():
+                                setattr(history, field, value)
+                    last = histories[-1].enroll_num
+                    db.session.commit()
+    print(f"Enrollment history compacted: {before} samples -> {after}")
+
+def sync_courses(rows, ges, term):
+    # Writes only the sections that changed, scoped to one term's GE categories.
+    # The changes and the term's new generation commit together, and the
+    # in-memory snapshot is swapped only after the commit succeeds.
+    existing = {}
+    deleted_keys = {}
+    for course in CourseModel.query.filter(CourseModel.term == term, CourseModel.ge.in_(ges)):
+        row = {field: getattr(course, field) for field in SECTION_FIELDS}
+        existing[section_key(row)] = (course.id, row)
+        deleted_keys[course.id] = (row["ge"], row["enroll_num"])
+
+    inserts, updates, deletes = diff_sections(existing, rows)
+    if inserts:
+        db.session.execute(insert(CourseModel), [dict(row, term=term) for row in inserts])
+    if updates:
+        db.session.execute(update(CourseModel), [{"id": row_id, **row} for row_id, row in updates])
+    if deletes:
+        db.session.execute(delete(CourseModel).where(CourseModel.id.in_(deletes)))
+
+    result = SyncResult(
+        inserted=len(inserts),
+        updated=len(updates),
+        deleted=len(deletes),
+        unchanged=len(existing) - len(updates) - len(deletes),
+    )
+    if not result.changed and course_snapshots.current(term) is not None:
+        db.session.rollback()
+        return result
+
+    snapshot = read_course_snapshot(term)
+    record = Snapshot(
+        term=term,
+        created_at=datetime.now(pytz.utc),
+        row_count=len(snapshot),
+        inserted=result.inserted,
+        updated=result.updated,
+        deleted=result.deleted,
+    )
+    db.session.add(record)
+    db.session.flush()
+    changes = [
+        {"generation": record.id, "term": term, "ge": row["ge"], "enroll_num": row["enroll_num"], "data": json.dumps(row)}
+        for row in inserts + [row for _, row in updates]
+    ] + [
+        {"generation": record.id, "term": term, "ge": deleted_keys[row_id][0], "enroll_num": deleted_keys[row_id][1], "data": None}
+        for row_id in deletes
+    ]
+    if changes:
+        db.session.execute(insert(SectionChange), changes)
+    record_enrollment(inserts + [row for _, row in updates], record.created_at, term)
+    # Pruned per term: generation ids are shared, so a busy term must not
+    # push a slower one's history out. A term's change log starts at its
+    # oldest kept snapshot row (see oldest_change), which is the last one
+    # published before the retention window.
+    cutoff = record.created_at.replace(tzinfo=None) - timedelta(seconds=CHANGE_LOG_RETENTION)
+    boundary = select(func.max(Snapshot.id)).where(Snapshot.term == term, Snapshot.created_at < cutoff).scalar_subquery()
+    db.session.execute(delete(Snapshot).where(Snapshot.term == term, Snapshot.id < boundary))
+    oldest = select(func.min(Snapshot.id)).where(Snapshot.term == term).scalar_subquery()
+    db.session.execute(delete(SectionChange).where(SectionChange.term == term, SectionChange.generation < oldest))
+    db.session.commit()
+
+    course_snapshots.publish(CourseSnapshot(record.id, snapshot.rows, record.created_at, term))
+    return result
+
+course_responses = {}  # term -> ResponseCache, so terms do not evict each other
+
+def term_responses(term):
+    cache = course_responses.get(term)
+    if cache is None:
+        cache = course_responses.setdefault(term, ResponseCache("courses"))
+    return cache
+
+def course_list_payload(snapshot, course_filter):
+    if course_filter == 'AnyGE':
+        data = list(snapshot.rows)
+    else:
+        data = [row for row in snapshot.rows if row["ge"] == course_filter]
+    return {"data": data}
+
+def courses_response(snapshot, course_filter):
+    if course_filter != 'AnyGE' and course_filter not in GE_CATEGORIES:
+        return CachedResponse(serialize(course_list_payload(snapshot, course_filter)))
+    return term_responses(snapshot.term).get(
+        snapshot.generation,
+        ("courses", course_filter),
+        lambda: course_list_payload(snapshot, course_filter),
+    )
+
+def course_index(snapshot):
+    return snapshot.derived("index", CourseIndex)
+
+def schedule_masks(snapshot):
+    return snapshot.derived("schedule_masks", ScheduleMasks)
+
+def search_index(snapshot):
+    return snapshot.derived("search", SearchIndex)
+
+def course_sections(snapshot, codes):
+    index = snapshot.derived("sections_by_course", sections_by_course)
+    return {code: index.get(normalize_course_code(code), []) for code in codes}
+
+def degree_sections_payload(snapshot, degree_name, requirements):
+    codes = list(dict.fromkeys(code for codes in requirements.values() for code in codes))
+    return {
+        "degree": degree_name,
+        "requirements": requirements,
+        "sections": course_sections(snapshot, codes),
+    }
+
+def oldest_change(term):
+    # Every change to the term after this generation is still in the log
+    return db.session.query(func.min(Snapshot.id)).filter(Snapshot.term == term).scalar()
+
+def changes_retained(snapshot, since):
+    # A version ahead of ours comes from a worker that followed the refresher
+    # sooner; that client already has everything this one could send
+    if since >= snapshot.generation:
+        return True
+    # Pruning only happens when the term publishes, so this holds for the generation
+    oldest = snapshot.derived("oldest_change", lambda rows: oldest_change(snapshot.term))
+    return oldest is not None and oldest <= since < snapshot.generation
+
+def course_changes_payload(snapshot, since):
+    # Sections changed after version `since` up to the snapshot's generation.
+    # A version older than the term's retained history asks the client to
+    # reload the full list; a newer one than ours gets an empty delta.
+    generation, term = snapshot.generation, snapshot.term
+    if not changes_retained(snapshot, since):
+        return {"version": generation, "since": since, "reset": True}
+    changes = db.session.execute(
+        select(SectionChange.ge, SectionChange.enroll_num, SectionChange.data)
+        .where(SectionChange.term == term, SectionChange.generation > since, SectionChange.generation <= generation)
+        .order_by(SectionChange.generation, SectionChange.id)
+    )
+    upserts, deletes = compact_changes(
+        (ge, enroll_num, json.loads(data) if data is not None else None) for ge, enroll_num, data in changes
+    )
+    return {"version": generation, "since": since, "reset": False, "upserts": upserts, "deletes": deletes}
+
+def course_changes(snapshot, since):
+    if since > snapshot.generation or not changes_retained(snapshot, since):
+        return CachedResponse(serialize(course_changes_payload(snapshot, since)))
+    return term_responses(snapshot.term).get(
+        snapshot.generation,
+        ("changes", since),
+        lambda: course_changes_payload(snapshot, since),
+    )
+
+generation_notifier = GenerationNotifier()
+course_snapshots.subscribe(lambda snapshot: generation_notifier.publish(snapshot.generation))
+
+serve_reads = True  # False in the refresher process, which never answers requests
+
+@course_snapshots.subscribe
+def warm_course_caches(snapshot):
+    # Runs on the refresh thread, so requests after a publish are served from memory
+    if not serve_reads:
+        return
+    term_responses(snapshot.term).reset(snapshot.generation)
+    for course_filter in ['AnyGE'] + GE_CATEGORIES:
+        courses_response(snapshot, course_filter)
+    course_index(snapshot)
+    schedule_masks(snapshot)
+    search_index(snapshot)
+    snapshot.derived("sections_by_course", sections_by_course)
+
+COURSE_QUERY_PARAMS = (
+    'limit', 'cursor', 'fields', 'open', 'min_open', 'class_type',
+    'instructor', 'location', 'days', 'start_after', 'end_before',
+    'busy', 'scheduled_only',
+)
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+MAX_SEARCH_RESULTS = 100
+MAX_SECTION_CODES = 200
+
+def int_arg(args, name, default=None, minimum=0):
+    value = args.get(name)
+    if value is None:
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer")
+    if value < minimum:
+        raise ValueError(f"{name} must be at least {minimum}")
+    return value
+
+def course_query_payload(snapshot, course_filter, args):
+    index = course_index(snapshot)
+
+    fields = SECTION_FIELDS
+    if args.get('fields'):
+        fields = tuple(field.strip() for field in args['fields'].split(',') if field.strip())
+        unknown = [field for field in fields if field not in SECTION_FIELDS]
+        if unknown:
+            raise ValueError(f"unknown fields: {', '.join(unknown)}")
+
+    min_open = int_arg(args, 'min_open')
+    if min_open is None and args.get('open', '').lower() in ('1', 'true', 'yes'):
+        min_open = 1
+    start_after = parse_time(args['start_after']) if args.get('start_after') else None
+    end_before = parse_time(args['end_before']) if args.get('end_before') else None
+
+    busy = parse_busy(args['busy']) if args.get('busy') else None
+    scheduled_only = args.get('scheduled_only', '').lower() in ('1', 'true', 'yes')
+
+    positions = index.search(
+        ge=None if course_filter == 'AnyGE' else course_filter,
+        min_open=min_open,
+        class_type=args.get('class_type'),
+        instructor=args.get('instructor'),
+        location=args.get('location'),
+        days=args.get('days'),
+        start_after=start_after,
+        end_before=end_before,
+    )
+    if busy is not None or scheduled_only:
+        positions = schedule_masks(snapshot).fitting(
+            busy if busy is not None else parse_busy(""), positions, scheduled_only,
+        )
+
+    limit = min(int_arg(args, 'limit', DEFAULT_PAGE_SIZE, minimum=1), MAX_PAGE_SIZE)
+    start = 0
+    if args.get('cursor'):
+        start = bisect.bisect_right(positions, decode_cursor(args['cursor'], snapshot.generation, index))
+    page = positions[start:start + limit]
+
+    next_cursor = None
+    if start + limit < len(positions):
+        last = page[-1]
+        next_cursor = encode_cursor(snapshot.generation, last, snapshot.rows[last])
+
+    return {
+        "data": [{field: snapshot.rows[position][field] for field in fields} for position in page],
+        "total": len(positions),
+        "next_cursor": next_cursor,
+    }
+
+def send_cached(entry, version=None):
+    response = app.response_class(entry.body, mimetype='application/json')
+    response.set_etag(entry.etag)
+    if version is not None:
+        # Clients pass this back as ?since= to /api/courses/changes
+        response.headers['X-Course-Version'] = str(version)
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+# Refresh jobs for different categories run concurrently; their writes take turns
+course_write_lock = threading.Lock()
+
+CHECKPOINT_MAX_AGE = 600  # seconds a category's last good scrape counts as fresh at startup
+# Creating this file (refresher.py --profile-next) profiles the next refresh:
+# the startup pass over every stale category, or else one scheduled category
+# refresh. The folded stacks land in PROFILE_DIR.
+PROFILE_FLAG = os.environ.get("PROFILE_FLAG", os.path.join(app.instance_path, "profile-next-refresh"))
+PROFILE_DIR = os.environ.get("PROFILE_DIR", os.path.join(app.instance_path, "profiles"))
+
+def category_checkpoint(term, ge):
+    checkpoint = db.session.get(CategoryCheckpoint, (term, ge))
+    if checkpoint is None:
+        checkpoint = CategoryCheckpoint(term=term, ge=ge, row_count=0, failures=0, rejections=0)
+        db.session.add(checkpoint)
+    return checkpoint
+
+def write_category(term, ge, courses):
+    # Runs on the pipeline's writer thread as each category finishes scraping.
+    # A result much smaller than what is stored is held back, so the last good
+    # sections stay published until the smaller count repeats.
+    rows = [course_to_row(course) for course in courses]
+    digest = rows_digest(rows)
+    now = datetime.now(pytz.utc)
+    started = time.perf_counter()
     with app.app_context():
         try:
-            CourseModel.query.delete()
-            categories = [
-                "CC", "ER", "IM", "MF", "SI", "SR", "TA", "PE-E", "PE-H", "PE-T", 
-                "PR-E", "PR-C", "PR-S", "C1", "C2"
-            ]
-            
-            all_courses = get_courses(categories)
-            
-            def add_courses_to_db(courses):
-                with app.app_context():
-                    for course in courses:
-                        db.session.add(CourseModel(
-                            ge=course.ge,
-                            code=course.code,
-                            name=course.name,
-                            instructor=course.instructor,
-                            link=course.link,
-                            class_count=course.class_count,
-                            enroll_num=course.enroll_num,
-                            class_type=course.class_type,
-                            schedule=course.schedule,
-                            location=course.location,
-                        ))
+            with course_write_lock:
+                checkpoint = category_checkpoint(term, ge)
+                checkpoint.attempted_at = now
+                previous = db.session.query(func.count(CourseModel.id)).filter(CourseModel.term == term, CourseModel.ge == ge).scalar()
+                if not plausible_result(previous, len(rows), checkpoint.rejected_count, checkpoint.rejections):
+                    checkpoint.rejections = checkpoint.rejections + 1 if checkpoint.rejected_count == len(rows) else 1
+                    checkpoint.rejected_count = len(rows)
                     db.session.commit()
-            
-            # Split courses into chunks for parallel processing
-            chunk_size = 100
-            course_chunks = [all_courses[i:i + chunk_size] for i in range(0, len(all_courses), chunk_size)]
-            
-            with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-                executor.map(add_courses_to_db, course_chunks)
-            
-            last_update_time = datetime.now(pytz.timezone('America/Los_Angeles'))
-            print("Courses updated in database.")
-        except Exception as e:
-            print(f"Error storing courses: {e}")
+                    raise SuspiciousResult(f"{term} {ge} returned {len(rows)} sections, {previous} stored")
+
+                if checkpoint.digest == digest:
+                    result = SyncResult(unchanged=len(rows))
+                    db.session.rollback()
+                else:
+                    result = sync_courses(rows, [ge], term)
+
+                checkpoint = category_checkpoint(term, ge)
+                checkpoint.row_count = len(rows)
+                checkpoint.digest = digest
+                checkpoint.succeeded_at = now
+                checkpoint.attempted_at = now
+                checkpoint.failures = 0
+                checkpoint.last_error = None
+                checkpoint.rejected_count = None
+                checkpoint.rejections = 0
+                db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+    record_sync(term, result, time.perf_counter() - started)
+    if result.changed:
+        print(f"{term} {ge} courses stored: {result}")
+    return result
 
-def schedule_jobs():
-    scheduler = BackgroundScheduler()
+def record_failures(term, errors):
+    if not errors:
+        return
+    with app.app_context(), course_write_lock:
+        for ge, error in errors.items():
+            checkpoint = category_checkpoint(term, ge)
+            checkpoint.attempted_at = datetime.now(pytz.utc)
+            checkpoint.failures += 1
+            checkpoint.last_error = str(error)[:200]
+        db.session.commit()
+
+def stale_categories(term, max_age):
+    # A term's categories without a good scrape in the last max_age seconds
+    cutoff = datetime.now(pytz.utc).replace(tzinfo=None) - timedelta(seconds=max_age)
+    with app.app_context():
+        fresh = {
+            ge for (ge,) in db.session.query(CategoryCheckpoint.ge)
+            .filter(
+                CategoryCheckpoint.term == term,
+                CategoryCheckpoint.succeeded_at >= cutoff,
+                CategoryCheckpoint.failures == 0,
+            )
+        }
+    return [ge for ge in GE_CATEGORIES if ge not in fresh]
+
+def store_courses_in_db(max_age=None, terms=None):
+    # Every unfrozen term by default. With max_age, categories scraped
+    # successfully within that many seconds are skipped.
+    for term in terms or refreshed_terms():
+        categories = GE_CATEGORIES if max_age is None else stale_categories(term, max_age)
+        if not categories:
+            print(f"All {term} categories have fresh checkpoints; skipping the initial scrape")
+            continue
+        name = f"refresh-{term}"
+        with profile_once(PROFILE_FLAG, PROFILE_DIR, name, threads=name):
+            results, errors = stream_courses(categories, functools.partial(write_category, term), term=term, name=name)
+        record_failures(term, errors)
+        print(f"{term} courses updated in database: {len(results)} categories stored, {len(errors)} failed")
+
+def refresh_category(term, ge):
+    # One GE category's refresh; returns the number of rows changed
+    name = f"refresh-{term}-{ge}"
+    with profile_once(PROFILE_FLAG, PROFILE_DIR, name, threads=name):
+        results, errors = stream_courses([ge], functools.partial(write_category, term), term=term, name=name)
+    record_failures(term, errors)
+    if ge in errors:
+        raise errors[ge]
+    return results[ge].changed
+
+# Terms other than the active one change rarely once enrollment settles
+INACTIVE_TERM_POLICY = RefreshPolicy(
+    base=int(os.environ.get("INACTIVE_TERM_REFRESH_INTERVAL", 3600)),
+    minimum=1800,
+    maximum=6 * 3600,
+    overnight_factor=1,
+    max_backoff=12 * 3600,  # never retried more often than a healthy category is refreshed
+)
+
+refresh_schedulers = {}  # term -> (AdaptiveRefreshScheduler, is_active)
+refresh_schedulers_lock = threading.Lock()
+
+def schedule_term_refreshes(scheduler, initial_delay=0):
+    # Brings the refresh jobs in line with the tracked terms: frozen terms get
+    # none, the active term the adaptive fast schedule, other terms a slow one
+    active = active_term()
+    wanted = {term: term == active for term in refreshed_terms()}
+    with refresh_schedulers_lock:
+        for term, (refresher, was_active) in list(refresh_schedulers.items()):
+            if wanted.get(term) != was_active:
+                refresher.stop()
+                del refresh_schedulers[term]
+                print(f"Stopped refreshing {term}")
+        for term, is_active in wanted.items():
+            if term in refresh_schedulers:
+                continue
+            refresher = AdaptiveRefreshScheduler(
+                scheduler,
+                functools.partial(refresh_category, term),
+                GE_CATEGORIES,
+                policy=None if is_active else INACTIVE_TERM_POLICY,
+                name=term,
+            )
+            refresher.start(initial_delay)
+            refresh_schedulers[term] = (refresher, is_active)
+            print(f"Refreshing {term} ({'active' if is_active else 'slow'})")
+
+def sync_terms(scheduler):
+    discover_terms()
+    schedule_term_refreshes(scheduler)
+
+def schedule_jobs(initial_delay=0):
+    scheduler = BackgroundScheduler(job_defaults={'max_instances': 1, 'coalesce': True})
     scheduler.add_job(update_all_courses, 'interval', weeks=3, id='update_all_courses_job')
-    scheduler.add_job(store_courses_in_db, 'interval', seconds=30, id='store_courses_in_db_job')
+    scheduler.add_job(compact_enrollment_history, 'cron', hour=3, id='compact_enrollment_history_job')
+    scheduler.add_job(sync_terms, 'interval', hours=1, args=[scheduler], id='sync_terms_job')
+    schedule_term_refreshes(scheduler, initial_delay)
     scheduler.start()
+    return scheduler
+
+STARTUP_REFRESH_DELAY = 30  # seconds before the per-category refresh jobs start
+# "all" serves the API and, if it wins the leader lock, also refreshes;
+# "api" only serves and follows whatever the refresher (refresher.py) commits
+APP_ROLE = os.environ.get("APP_ROLE", "all")
+VERSION_CHECK_INTERVAL = float(os.environ.get("VERSION_CHECK_INTERVAL", 2))  # seconds
+leader_lock = LeaderLock(os.environ.get("REFRESHER_LOCK", os.path.join(app.instance_path, "refresher.lock")))
+
+startup_lock = threading.Lock()
+startup_state = {
+    "role": None,
+    "started_at": None,
+    "ready_at": None,
+    "snapshot": False,
+    "degrees": False,
+    "initial_refresh": "pending",
+    "scheduler": False,
+    "error": None,
+}
+
+def load_read_models():
+    load_terms()
+    snapshot = current_course_snapshot()
+    model = current_degree_model()
+    with startup_lock:
+        startup_state["snapshot"] = len(snapshot) > 0
+        startup_state["degrees"] = len(model) > 0
+        startup_state["error"] = None
+
+def check_versions():
+    # Cheap indexed max() lookups; a term's snapshot or the degree model is
+    # only rebuilt when the refresher has committed a newer version of it
+    with app.app_context():
+        generations = dict(db.session.query(Snapshot.term, func.max(Snapshot.id)).group_by(Snapshot.term))
+        catalog_version = db.session.query(func.max(CatalogSync.id)).scalar() or 0
+    for term, generation in generations.items():
+        snapshot = course_snapshots.current(term)
+        if snapshot is None or generation > snapshot.generation:
+            with app.app_context():
+                course_snapshots.publish(read_course_snapshot(term))
+    model = degree_read_model
+    if model is None or catalog_version > model.version:
+        load_degree_model()
+    load_read_models()
+
+def follow_refresher():
+    while True:
+        try:
+            check_versions()
+        except Exception as e:
+            with startup_lock:
+                startup_state["error"] = str(e)
+        time.sleep(VERSION_CHECK_INTERVAL)
+
+def warm_up(refresh=True):
+    # Serve what is already in the database first, then bring it up to date.
+    # Only the refreshing process migrates; readers retry until it is done.
+    if refresh:
+        try:
+            create_db()
+        except Exception as e:
+            with startup_lock:
+                startup_state["initial_refresh"] = "failed"
+                startup_state["error"] = str(e)
+            print(f"Upgrading the database failed: {e}")
+            return
+    try:
+        load_read_models()
+    except Exception as e:
+        with startup_lock:
+            startup_state["error"] = str(e)
+        print(f"Loading stored data failed: {e}")
+
+    if not refresh:
+        with startup_lock:
+            startup_state["initial_refresh"] = "refresher"
+        follow_refresher()
+        return
+
+    try:
+        with startup_lock:
+            startup_state["initial_refresh"] = "running"
+        discover_terms()
+        if not len(current_degree_model()):
+            update_all_courses()
+        store_courses_in_db(max_age=CHECKPOINT_MAX_AGE)
+        load_read_models()
+        with startup_lock:
+            startup_state["initial_refresh"] = "done"
+    except Exception as e:
+        with startup_lock:
+            startup_state["initial_refresh"] = "failed"
+            startup_state["error"] = str(e)
+        print(f"Initial refresh failed: {e}")
+
+    schedule_jobs(initial_delay=STARTUP_REFRESH_DELAY)
+    with startup_lock:
+        startup_state["scheduler"] = True
+
+def bootstrap(role=None):
+    # Called once per serving process, by __main__ or gunicorn's post_worker_init
+    # hook. Returns straight away; loading and refreshing happen in the background.
+    # Of several "all" processes only the one holding the leader lock refreshes.
+    role = role or APP_ROLE
+    with startup_lock:
+        if startup_state["started_at"] is not None:
+            return
+        startup_state["started_at"] = datetime.now(pytz.utc)
+    leader = role == "all" and leader_lock.acquire()
+    with startup_lock:
+        startup_state["role"] = "leader" if leader else "reader"
+    threading.Thread(target=warm_up, args=(leader,), name="warm-up", daemon=True).start()
+
+def run_refresher(wait=False):
+    # Entry point for refresher.py: scrapes and writes, serves nothing
+    global serve_reads
+    if not leader_lock.acquire(blocking=wait):
+        print(f"Another refresher holds {leader_lock.path} (pid {leader_lock.holder()})")
+        return False
+    serve_reads = False
+    with startup_lock:
+        startup_state["role"] = "refresher"
+        startup_state["started_at"] = datetime.now(pytz.utc)
+    warm_up(refresh=True)
+    return True
+
+def readiness():
+    with startup_lock:
+        state = dict(startup_state)
+        ready = state["snapshot"] and state["degrees"]
+        if ready and state["ready_at"] is None:
+            startup_state["ready_at"] = state["ready_at"] = datetime.now(pytz.utc)
+    for key in ("started_at", "ready_at"):
+        state[key] = state[key].isoformat() if state[key] else None
+    state["ready"] = ready
+    return state
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    body, content_type = exposition()
+    return app.response_class(body, content_type=content_type)
+
+@app.route('/api/ready', methods=['GET'])
+def ready():
+    state = readiness()
+    return jsonify(state), 200 if state["ready"] else 503
 
 @app.route('/api/last_update', methods=['GET'])
 def last_update():
     return get_last_update()
 
+@app.route('/api/refresh_status', methods=['GET'])
+def refresh_status():
+    with refresh_schedulers_lock:
+        schedulers = dict(refresh_schedulers)
+    if not schedulers:
+        return jsonify({"error": "Refresh jobs are not scheduled"}), 503
+    return jsonify({term: refresher.status() for term, (refresher, _) in schedulers.items()})
+
+@app.route('/api/terms', methods=['GET'])
+def get_terms():
+    registry = term_registry
+    return jsonify({"active": registry["active"], "terms": list(registry["terms"].values())})
+
 @app.route('/api/courses/<degree_name>', methods=['GET'])
 def get_courses_major(degree_name):
-    degree = Degree.query.filter_by(name=degree_name).first()
-    if not degree:
+    document = current_degree_model().document(degree_name)
+    if document is None:
         return jsonify({"error": "Degree not found"}), 404
-    
-    courses = Course.query.filter_by(degree_id=degree.id).all()
-    course_list = {}
-    for course in courses:
-        if course.course_type not in course_list:
-            course_list[course.course_type] = []
-        course_list[course.course_type].append(course.course_code)
-    
-    return jsonify(course_list)
+
+    return send_cached(document)
+
+@app.route('/api/degrees/<degree_name>/sections', methods=['GET'])
+def get_degree_sections(degree_name):
+    # Every current section for every course the degree requires, in one response
+    snapshot = requested_snapshot()
+    model = current_degree_model()
+    degree_name = model.resolve(degree_name)
+    if degree_name is None:
+        return jsonify({"error": "Degree not found"}), 404
+
+    requirements = model.requirements[degree_name]
+    return send_cached(term_responses(snapshot.term).get(
+        snapshot.generation,
+        ("degree_sections", degree_name, model.version),
+        lambda: degree_sections_payload(snapshot, degree_name, requirements),
+    ))
+
+@app.route('/api/sections', methods=['GET'])
+def get_sections_for_courses():
+    codes = [code.strip() for code in request.args.get('codes', '').split(',') if code.strip()]
+    if not codes:
+        return jsonify({"error": "codes is required"}), 400
+    if len(codes) > MAX_SECTION_CODES:
+        return jsonify({"error": f"at most {MAX_SECTION_CODES} codes per request"}), 400
+
+    payload = {"sections": course_sections(requested_snapshot(), codes)}
+    return send_cached(CachedResponse(serialize(payload)))
+
+def time_arg(args, name, default=None):
+    # Epoch seconds or an ISO 8601 time; naive times are campus time
+    value = args.get(name)
+    if value is None:
+        return default
+    if value.isdigit():
+        return int(value)
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"{name} must be epoch seconds or an ISO 8601 time")
+    if parsed.tzinfo is None:
+        parsed = pytz.timezone('America/Los_Angeles').localize(parsed)
+    return int(parsed.timestamp())
+
+def enrollment_samples(enroll_num):
+    history = db.session.get(EnrollmentHistory, (requested_term(), enroll_num))
+    return decode_samples(history) if history is not None else None
+
+@app.route('/api/sections/<int:enroll_num>/history', methods=['GET'])
+def get_enrollment_history(enroll_num):
+    try:
+        since = time_arg(request.args, 'since', 0)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    samples = enrollment_samples(enroll_num)
+    if samples is None:
+        return jsonify({"error": "No history for this section"}), 404
+    samples = [sample for sample in samples if sample[0] >= since]
+    return jsonify({
+        "enroll_num": enroll_num,
+        "samples": [list(sample) for sample in samples],  # [time, open, total]
+        "fill_rate": [list(point) for point in fill_curve(samples)],  # [time, fraction taken]
+    })
+
+@app.route('/api/sections/<int:enroll_num>/forecast', methods=['GET'])
+def get_enrollment_forecast(enroll_num):
+    now = int(datetime.now(pytz.utc).timestamp())
+    try:
+        at = time_arg(request.args, 'at')
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if at is None:
+        return jsonify({"error": "at is required"}), 400
+    samples = enrollment_samples(enroll_num)
+    if samples is None:
+        return jsonify({"error": "No history for this section"}), 404
+    estimate, per_day, full_at = estimate_open(samples, at, now)
+    _, open_now, total = samples[-1]
+    return jsonify({
+        "enroll_num": enroll_num,
+        "at": at,
+        "open_now": open_now,
+        "total": total,
+        "estimated_open": estimate,
+        "open_change_per_day": round(per_day, 2),
+        "full_at": full_at,
+    })
 
 @app.route('/api/degrees', methods=['GET'])
 def get_all_degrees():
-    degrees = Degree.query.all()
-    return jsonify([degree.name for degree in degrees])
+    return send_cached(current_degree_model().degree_list)
 
 @app.route('/api/courses', methods=['GET'])
 def get_courses_data():
     course_filter = request.args.get('course', 'AnyGE')
-    query = CourseModel.query.filter_by(ge=course_filter) if course_filter != 'AnyGE' else CourseModel.query
-    data = [{
-        "ge": course.ge,
-        "code": course.code,
-        "name": course.name,
-        "instructor": course.instructor,
-        "link": course.link,
-        "class_count": course.class_count,
-        "enroll_num": course.enroll_num,
-        "class_type": course.class_type,
-        "schedule": course.schedule,
-        "location": course.location,
-    } for course in query.all()]
-    return jsonify({"data": data})
+    snapshot = requested_snapshot()
+    if not any(param in request.args for param in COURSE_QUERY_PARAMS):
+        return send_cached(courses_response(snapshot, course_filter), snapshot.generation)
 
-if __name__ == '__main__':
-    with app.app_context():
-            print("Initializing database with initial data...")
-            create_db()
-            store_courses_in_db()
+    try:
+        payload = course_query_payload(snapshot, course_filter, request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return send_cached(CachedResponse(serialize(payload)), snapshot.generation)
 
-            update_all_courses()
-        
-    schedule_jobs()
-    app.run(host='0.0.0.0', port=5001)
\ No newline at end of file
+@app.route('/api/courses/changes', methods=['GET'])
+def get_course_changes():
+    snapshot = requested_snapshot()
+    try:
+        since = int_arg(request.args, 'since', 0)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return send_cached(course_changes(snapshot, since), snapshot.generation)
+
+SSE_KEEPALIVE = 15  # seconds between comments that keep proxies from closing the stream
+SSE_MAX_DURATION = 300  # seconds; clients reconnect with Last-Event-ID so workers are not held forever
+# Each open stream holds a worker thread, so gunicorn runs threaded workers (gunicorn.conf.py)
+
+@app.route('/api/courses/stream', methods=['GET'])
+def stream_course_changes():
+    # Server-Sent Events: one "changes" event per published generation, each
+    # carrying the same delta /api/courses/changes would return
+    try:
+        since = int_arg(request.args, 'since', None)
+        if since is None and request.headers.get('Last-Event-ID', '').isdigit():
+            since = int(request.headers['Last-Event-ID'])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    term = requested_term()
+
+    def events():
+        version = current_course_snapshot(term).generation if since is None else since
+        deadline = time.monotonic() + SSE_MAX_DURATION
+        yield b"retry: 5000\n\n"
+        while time.monotonic() < deadline:
+            # Generations are shared by all terms, so a wake-up may be for
+            # another term; only a timeout means nothing was published
+            seen = generation_notifier.generation
+            snapshot = current_course_snapshot(term)
+            if snapshot.generation > version:
+                entry = course_changes(snapshot, version)
+                yield sse_event(entry.body, event="changes", event_id=snapshot.generation)
+                version = snapshot.generation
+                continue
+            # stream_with_context keeps the app context, and with it any pooled
+            # connection a delta checked out, alive; hand it back before waiting
+            db.session.remove()
+            timeout = min(SSE_KEEPALIVE, max(deadline - time.monotonic(), 0))
+            if generation_notifier.wait(seen, timeout) == seen:
+                yield b": keepalive\n\n"
+
+    response = app.response_class(stream_with_context(events()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/api/search', methods=['GET'])
+def search_courses():
+    query = request.args.get('q', '')
+    course_filter = request.args.get('course', 'AnyGE')
+    try:
+        limit = min(int_arg(request.args, 'limit', 20, minimum=1), MAX_SEARCH_RESULTS)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    results = search_index(requested_snapshot()).search(
+        query,
+        limit=limit,
+        ge=None if course_filter == 'AnyGE' else course_filter,
+    )
+    return jsonify({"data": results})
+
+if __name__ == '__main__':
+    bootstrap()
+    app.run(host='0.0.0.0', port=int(os.environ.get('PORT', 5001)))
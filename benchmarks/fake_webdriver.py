@@ -0,0 +1,134 @@
+"""A stand-in for a remote Selenium session, driven against the stub server.
+
+Implements only the WebDriver calls src.services.ucsc_courses makes. Pages
+are fetched over HTTP from the stub server and parsed with lxml, clicks on
+the search button and the "next" link submit the page's form the way the
+browser would, and EXTRACT_ROWS_SCRIPT is answered with the lxml row
+extraction that produces the same dicts. Every command waits
+command_latency_ms, standing in for the round trip to the Selenium hub.
+"""
+import time
+
+import requests
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+
+from src.services.class_search_parser import ROW_XPATH, extract_rows, form_fields, parse_document, search_form
+
+# The CSS selectors the scraper uses, as XPath
+CSS_SELECTORS = {
+    "div.panel.panel-default.row": ROW_XPATH,
+    "option:checked": ".//option[@selected]",
+}
+
+
+def to_xpath(by, value):
+    if by == By.XPATH:
+        return value
+    if by == By.ID:
+        return f".//*[@id='{value}']"
+    if by == By.CSS_SELECTOR and value in CSS_SELECTORS:
+        return CSS_SELECTORS[value]
+    raise NotImplementedError(f"fake WebDriver does not support {by}={value!r}")
+
+
+class FakeElement:
+    def __init__(self, driver, element):
+        self.driver = driver
+        self.element = element
+
+    @property
+    def text(self):
+        return " ".join(self.element.text_content().split())
+
+    def is_displayed(self):
+        return True
+
+    def is_enabled(self):
+        return True
+
+    def find_element(self, by, value):
+        self.driver.command()
+        matches = self.element.xpath(to_xpath(by, value))
+        if not matches and value == "option:checked":
+            matches = self.element.xpath(".//option")[:1]
+        if not matches:
+            raise NoSuchElementException(f"{by}={value}")
+        return FakeElement(self.driver, matches[0])
+
+    def click(self):
+        self.driver.command()
+        self.driver.clicked(self.element)
+
+
+class FakeWebDriver:
+    def __init__(self, command_latency_ms=5.0):
+        self.latency = command_latency_ms / 1000
+        self.session = requests.Session()
+        self.url = None
+        self.document = None
+        self.source = ""
+        self.selected = {}  # select name -> option value picked by clicks
+        self.commands = 0
+
+    def command(self):
+        self.commands += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def load(self, response):
+        response.raise_for_status()
+        self.source = response.text
+        self.document = parse_document(response.content)
+
+    def get(self, url):
+        self.command()
+        self.url = url.split("#")[0]
+        self.selected = {}
+        self.load(self.session.get(self.url, timeout=20))
+
+    def submit(self, fields):
+        self.load(self.session.post(self.url, data=fields, timeout=20))
+
+    def clicked(self, element):
+        if element.tag == "option":
+            select = next(element.iterancestors("select"))
+            self.selected[select.get("name")] = element.get("value")
+        elif element.tag == "input" and element.get("type") == "submit":
+            fields = form_fields(search_form(self.document))
+            fields.update(self.selected)
+            fields["action"] = "results"
+            self.submit(fields)
+        elif element.xpath("self::a[contains(@onclick, 'next')]"):
+            fields = form_fields(search_form(self.document))
+            fields["action"] = "next"
+            self.submit(fields)
+
+    @property
+    def page_source(self):
+        self.command()
+        return self.source
+
+    def find_element(self, by, value):
+        self.command()
+        matches = self.document.xpath(to_xpath(by, value)) if self.document is not None else []
+        if not matches:
+            raise NoSuchElementException(f"{by}={value}")
+        return FakeElement(self, matches[0])
+
+    def find_elements(self, by, value):
+        self.command()
+        if self.document is None:
+            return []
+        return [FakeElement(self, element) for element in self.document.xpath(to_xpath(by, value))]
+
+    def execute_script(self, script, *args):
+        self.command()
+        if script.strip() == "return 1":
+            return 1
+        if "panel-default" in script:
+            return extract_rows(self.document, self.url)
+        raise NotImplementedError("fake WebDriver only runs the scraper's scripts")
+
+    def quit(self):
+        self.session.close()
@@ -0,0 +1,228 @@
+"""Regenerates the HTML fixtures under benchmarks/fixtures.
+
+    python -m benchmarks.generate_fixtures
+
+The pages are deterministic and follow the markup the scrapers rely on
+(catalog.ucsc.edu degree pages and the bachelor's degree listing, and the
+pisa.ucsc.edu class search form and its paginated results), padded with the
+navigation and prose that make up most of a real page's bytes.
+"""
+import os
+import random
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+CATALOG_DIR = os.path.join(FIXTURES_DIR, "catalog")
+CATALOG_LISTING = os.path.join(FIXTURES_DIR, "catalog_listing.html")
+PISA_DIR = os.path.join(FIXTURES_DIR, "pisa")
+DEGREES_PATH = "/en/current/general-catalog/academic-programs/bachelors-degrees/"
+
+SUBJECTS = ["AM", "ANTH", "BIOE", "BIOL", "CHEM", "CMPM", "CSE", "ECE", "ECON", "ENVS", "HIS", "LIT", "MATH", "PHYS", "PSYC", "STAT", "WRIT"]
+COURSE_TYPES = [
+    "Major Qualification",
+    "Lower-Division Courses",
+    "Upper-Division Courses",
+    "Electives",
+    "Disciplinary Communications (DC) Requirements",
+    "Capstone Requirement",
+]
+DEGREES = [
+    "Agroecology B.A.", "Anthropology B.A.", "Applied Linguistics and Multilingualism B.A.",
+    "Applied Mathematics B.S.", "Biology B.S.", "Biomolecular Engineering and Bioinformatics B.S.",
+    "Chemistry B.S.", "Computer Engineering B.S.", "Computer Science B.S.", "Economics B.A.",
+    "Environmental Studies B.A.", "History B.A.", "Literature B.A.", "Physics B.S.",
+    "Psychology B.A.", "Technology and Information Management B.S.",
+]
+LOREM = (
+    "Students must complete the following courses with a grade of C or better. "
+    "Transfer students should consult the department advising office before enrolling. "
+    "Courses used to satisfy major requirements may not be taken Pass/No Pass. "
+)
+
+
+def slug(name):
+    return "".join(c.lower() if c.isalnum() else "-" for c in name).strip("-")
+
+
+def navigation(rng):
+    links = "".join(
+        f'<li><a href="/en/current/general-catalog/courses/{s.lower()}-{n}">{s} {n}</a></li>'
+        for s in SUBJECTS for n in rng.sample(range(1, 200), 25)
+    )
+    return f'<nav id="sidebar"><ul class="nav">{links}</ul></nav>'
+
+
+def course_link(code):
+    href = "/en/current/general-catalog/courses/" + code.lower().replace(" ", "-")
+    return f'<a class="sc-courselink" href="{href}" data-code="{code}">{code.replace(" ", "&nbsp;", 1) if " " in code else code}</a>'
+
+
+def requirement_block(rng):
+    codes = [f"{rng.choice(SUBJECTS)} {rng.randint(1, 199)}{rng.choice(['', '', 'A', 'B', 'L'])}" for _ in range(rng.randint(3, 14))]
+    codes += rng.sample(codes, min(2, len(codes)))  # repeated in "or" alternatives
+    rows = "".join(
+        f"<tr><td>{course_link(code)}</td><td>{rng.choice(['Introduction to', 'Advanced', 'Topics in'])} {rng.choice(SUBJECTS)}</td><td>5</td></tr>"
+        for code in codes
+    )
+    parts = [
+        f"<p>{LOREM * rng.randint(1, 3)}</p>",
+        f'<table class="sc_courselist"><tbody>{rows}</tbody></table>',
+        f"<div class=\"note\"><span>Or one of: {course_link(rng.choice(codes))}, <a class=\"sc-courselink\" href=\"#\">  </a></span></div>",
+    ]
+    return "".join(parts)
+
+
+def degree_page(name, rng):
+    sections = []
+    for course_type in rng.sample(COURSE_TYPES, rng.randint(3, len(COURSE_TYPES))):
+        sections.append(f'<h4 class="sc-RequiredCoursesHeading2">{course_type}</h4>')
+        for _ in range(rng.randint(1, 3)):
+            sections.append(requirement_block(rng))
+        if rng.random() < 0.3:
+            sections.append(f'<h4 class="sc-PlanHeading">Planner</h4><p>{LOREM}{course_link("WRIT 2")}</p>')
+    return (
+        '<!DOCTYPE html><html lang="en"><head><meta charset="utf-8">'
+        f"<title>{name} | UC Santa Cruz General Catalog</title></head><body>"
+        f'<header><div id="breadcrumb"><a href="/">Home</a> / <a href="/en/current/general-catalog/">General Catalog</a></div></header>'
+        f"{navigation(rng)}"
+        f'<main id="main"><h1>{name}</h1><div id="degree-req-1"><p>{LOREM * 4}</p></div>'
+        f'<div id="degree-req-2" class="sc-degree-requirements"><h3>Requirements and Planners</h3>{"".join(sections)}</div>'
+        "</main><footer><p>&copy; Regents of the University of California</p></footer></body></html>"
+    )
+
+
+def degree_filename(name):
+    return slug(name) + ".html"
+
+
+def write_catalog_fixtures():
+    os.makedirs(CATALOG_DIR, exist_ok=True)
+    for i, name in enumerate(DEGREES):
+        with open(os.path.join(CATALOG_DIR, degree_filename(name)), "w", encoding="utf-8") as f:
+            f.write(degree_page(name, random.Random(i)))
+
+
+def catalog_listing():
+    links = "".join(f'<li><a href="{DEGREES_PATH}{slug(name)}">{name}</a></li>' for name in DEGREES)
+    return (
+        '<!DOCTYPE html><html lang="en"><head><meta charset="utf-8">'
+        "<title>Bachelor's Degrees | UC Santa Cruz General Catalog</title></head><body>"
+        '<main id="main"><div id="breadcrumb"><a href="/">Home</a> / <a href="/en/current/general-catalog/">General Catalog</a></div>'
+        f"<h1>Bachelor's Degrees</h1><ul>{links}</ul></main></body></html>"
+    )
+
+
+# Class search. GE_SECTIONS sets how many sections each GE category has, so
+# categories take between one and six results pages of PAGE_SIZE rows.
+TERMS = [("2250", "2025 Winter Quarter"), ("2248", "2024 Fall Quarter"), ("2244", "2024 Summer Quarter")]
+SELECTED_TERM = "2248"
+GE_CATEGORIES = ["CC", "ER", "IM", "MF", "SI", "SR", "TA", "PE-E", "PE-H", "PE-T", "PR-E", "PR-C", "PR-S", "C1", "C2"]
+PAGE_SIZE = 25
+TITLES = ["Introduction to", "Advanced", "Topics in", "Seminar in", "Foundations of", "Methods in"]
+INSTRUCTORS = ["Tantalo,P.", "Smith,J.", "Garcia,M.", "Nguyen,T.", "Kim,S.", "Patel,R.", "Lee,A.", "Staff"]
+MODES = ["In Person", "Asynchronous Online", "Synchronous Online", "Hybrid"]
+MEETINGS = ["MWF 09:20AM-10:25AM", "MWF 01:20PM-02:25PM", "TuTh 11:40AM-01:15PM", "TuTh 05:20PM-06:55PM", "MW 03:20PM-04:55PM", "Cancelled", "TBA"]
+LOCATIONS = ["LEC: Thimann Lab 003", "LEC: Earth&Marine B206", "LEC: Kresge Clrm 321", "SEM: Humanities 1 210", "LEC: Remote Instruction"]
+
+
+def ge_sections(ge):
+    return random.Random(f"sections-{ge}").randint(10, 150)
+
+
+def select(name, element_id, options, selected=None):
+    rendered = "".join(
+        f'<option value="{value}"{" selected" if value == selected else ""}>{label}</option>'
+        for value, label in options
+    )
+    return f'<select name="{name}" id="{element_id}" class="form-control">{rendered}</select>'
+
+
+def search_form():
+    return (
+        '<form id="searchForm" action="index.php" method="post" class="form-horizontal">'
+        '<input type="hidden" name="action" value="results">'
+        f'<label for="term_dropdown">Term</label>{select("binds[:term]", "term_dropdown", TERMS, SELECTED_TERM)}'
+        '<select name="binds[:reg_status]" id="reg_status"><option value="all" selected>All Classes</option><option value="O">Open Classes</option></select>'
+        '<input type="text" name="binds[:subject]" id="subject" value="">'
+        '<input type="text" name="binds[:catalog_nbr]" id="catalog_nbr" value="">'
+        f'<label for="ge">General Education</label>{select("binds[:ge]", "ge", [("", "")] + [(ge, ge) for ge in GE_CATEGORIES], "")}'
+        '<input type="submit" value="Search" class="btn btn-primary">'
+        "</form>"
+    )
+
+
+def page_shell(title, content):
+    return (
+        '<!DOCTYPE html><html lang="en"><head><meta charset="utf-8">'
+        f"<title>{title}</title></head><body>"
+        '<header class="navbar"><a class="navbar-brand" href="index.php">UCSC Class Search</a></header>'
+        f'<div class="container">{content}</div>'
+        f"<footer><p>{LOREM}</p></footer></body></html>"
+    )
+
+
+def section_panel(ge, index, rng):
+    subject = rng.choice(SUBJECTS)
+    enroll_num = 20000 + GE_CATEGORIES.index(ge) * 1000 + index
+    total = rng.choice([25, 40, 60, 120, 250])
+    enrolled = rng.randint(0, total)
+    code = f"{subject} {rng.randint(1, 199)}{rng.choice(['', '', 'A', 'L'])} - {rng.randint(1, 3):02d}"
+    title = f"{rng.choice(TITLES)} {rng.choice(SUBJECTS)}"
+    return (
+        f'<div class="panel panel-default row" id="rowpanel_{index}">'
+        '<div class="panel-heading panel-heading-custom"><h2 style="margin:0px;">'
+        f'<a id="class_id_{enroll_num}" href="index.php?action=detail&amp;class_data={enroll_num}">{code}&nbsp;&nbsp;&nbsp;{title}</a>'
+        "</h2></div>"
+        '<div class="panel-body"><div class="row">'
+        f'<div class="col-xs-6 col-sm-3"><a id="class_nbr_{enroll_num}" href="#">Class Number:</a> {enroll_num}</div>'
+        f'<div class="col-xs-6 col-sm-3"><i class="sr-only">Instructor:</i> {rng.choice(INSTRUCTORS)}</div>'
+        f'<div class="col-xs-6 col-sm-3">{enrolled} of {total} Enrolled</div>'
+        f'<div class="col-xs-6 col-sm-6"><i class="sr-only">Location:</i> {rng.choice(LOCATIONS)}</div>'
+        f'<div class="col-xs-6 col-sm-6"><i class="sr-only">Day and Time:</i> {rng.choice(MEETINGS)}</div>'
+        '<div class="col-xs-6 col-sm-3 hide-print"><a href="#">Materials</a></div>'
+        '<div class="col-xs-6 col-sm-3 hide-print">Summer Session: N/A</div>'
+        f'<div class="col-xs-6 col-sm-3 hide-print"><i class="sr-only">Instruction Mode:</i> {rng.choice(MODES)}</div>'
+        "</div></div></div>"
+    )
+
+
+def results_page(ge, page, rng):
+    count = ge_sections(ge)
+    start = page * PAGE_SIZE
+    panels = "".join(section_panel(ge, index, rng) for index in range(start, min(start + PAGE_SIZE, count)))
+    has_next = start + PAGE_SIZE < count
+    navigation = f"<p>{start + 1} - {min(start + PAGE_SIZE, count)} of {count}</p>"
+    if has_next:
+        navigation += '<a href="#" onclick="return submitForm(\'next\');">next</a>'
+    form = (
+        '<form id="results_form" action="index.php" method="post">'
+        '<input type="hidden" name="action" value="next">'
+        f'<input type="hidden" name="binds[:ge]" value="{ge}">'
+        f'<input type="hidden" name="binds[:term]" value="{SELECTED_TERM}">'
+        f'<input type="hidden" name="rec_start" value="{start}">'
+        f'<input type="hidden" name="rec_dur" value="{PAGE_SIZE}">'
+        "</form>"
+    )
+    return page_shell("UCSC Class Search | Results", f"{form}{navigation}<div class=\"center-block\">{panels}</div>{navigation}")
+
+
+def write_pisa_fixtures():
+    os.makedirs(PISA_DIR, exist_ok=True)
+    with open(os.path.join(PISA_DIR, "search.html"), "w", encoding="utf-8") as f:
+        f.write(page_shell("UCSC Class Search", search_form()))
+    for ge in GE_CATEGORIES:
+        rng = random.Random(f"results-{ge}")
+        for page in range(-(-ge_sections(ge) // PAGE_SIZE)):
+            with open(os.path.join(PISA_DIR, f"{ge}-{page}.html"), "w", encoding="utf-8") as f:
+                f.write(results_page(ge, page, rng))
+
+
+def main():
+    write_catalog_fixtures()
+    with open(CATALOG_LISTING, "w", encoding="utf-8") as f:
+        f.write(catalog_listing())
+    write_pisa_fixtures()
+    print(f"Wrote fixtures to {FIXTURES_DIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""Benchmark for the catalog requirement parser.
+
+    python -m benchmarks.requirements_parser [--rounds 20] [--json]
+
+Parses every saved page under benchmarks/fixtures/catalog with the lxml
+parser in src.services.major_courses and with the html.parser/BeautifulSoup
+implementation it replaced, checks that both produce identical output, and
+reports pages per second and peak memory. Each parser runs in a fresh
+subprocess. Peak memory is how far the process's resident set peaked above
+where it was before parsing: on Linux the high-water mark (VmHWM) is reset
+through /proc/self/clear_refs once the fixtures are loaded, so it counts
+libxml2's C allocations too. Elsewhere it falls back to tracemalloc, which
+sees only Python allocations; the "memory" field says which was used.
+"""
+import argparse
+import gc
+import glob
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+from bs4 import BeautifulSoup
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "catalog", "*.html")
+
+
+def legacy_parse_courses_from_page(content):
+    # The pre-lxml implementation, kept verbatim as the reference
+    soup = BeautifulSoup(content, 'html.parser')
+
+    courses_by_type = {}
+
+    course_types = soup.find_all('h4', class_='sc-RequiredCoursesHeading2')
+
+    for course_type in course_types:
+        course_type_text = course_type.get_text(strip=True)
+
+        next_element = course_type.find_next_sibling()
+
+        course_list = []
+
+        while next_element and next_element.name != 'h4':
+            course_links = next_element.find_all('a', class_='sc-courselink')
+
+            for link in course_links:
+                if link.get_text(strip=True) not in course_list and link.get_text(strip=True) != "":
+                    course_list.append(link.get_text(strip=True))
+
+            next_element = next_element.find_next_sibling()
+
+        if course_list:
+            courses_by_type[course_type_text] = course_list
+
+    return courses_by_type
+
+
+def parsers():
+    from src.services.major_courses import parse_courses_from_page
+    return {"legacy": legacy_parse_courses_from_page, "lxml": parse_courses_from_page}
+
+
+def load_pages():
+    pages = []
+    for path in sorted(glob.glob(FIXTURES)):
+        with open(path, "rb") as f:
+            pages.append((os.path.basename(path), f.read()))
+    if not pages:
+        raise SystemExit("No fixtures found; run python -m benchmarks.generate_fixtures")
+    return pages
+
+
+def check_identical(pages):
+    available = parsers()
+    mismatches = []
+    for name, content in pages:
+        expected = available["legacy"](content)
+        actual = available["lxml"](content)
+        if json.dumps(expected) != json.dumps(actual):
+            mismatches.append(name)
+    return mismatches
+
+
+def proc_status_kb(key):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(key + ":"):
+                return int(line.split()[1])
+    raise KeyError(key)
+
+
+def peak_memory(parse, pages):
+    # -> (KB the parse of every page peaked at above the starting point, source)
+    gc.collect()
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")  # resets VmHWM to the current RSS
+        before = proc_status_kb("VmRSS")
+    except OSError:
+        tracemalloc.start()
+        for _, content in pages:
+            parse(content)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return peak // 1024, "tracemalloc"
+    for _, content in pages:
+        parse(content)
+    return proc_status_kb("VmHWM") - before, "rss"
+
+
+def measure(parser_name, rounds):
+    # Runs inside the worker subprocess
+    pages = load_pages()
+    parse = parsers()[parser_name]
+    # Measured in a pass of its own, before the timed rounds
+    peak_kb, source = peak_memory(parse, pages)
+
+    timings = []
+    for _ in range(rounds):
+        for _, content in pages:
+            started = time.perf_counter()
+            parse(content)
+            timings.append(time.perf_counter() - started)
+    total = sum(timings)
+    return {
+        "parser": parser_name,
+        "pages": len(timings),
+        "bytes_per_page": sum(len(content) for _, content in pages) // len(pages),
+        "pages_per_second": len(timings) / total,
+        "mean_ms": total / len(timings) * 1000,
+        "peak_memory_kb": peak_kb,
+        "memory": source,
+    }
+
+
+def run_worker(parser_name, rounds):
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.requirements_parser", "--worker", parser_name, "--rounds", str(rounds)],
+        check=True,
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    ).stdout
+    return json.loads(output)
+
+
+def run(rounds=20):
+    pages = load_pages()
+    mismatches = check_identical(pages)
+    results = {name: run_worker(name, rounds) for name in ("legacy", "lxml")}
+    return {
+        "fixtures": len(pages),
+        "identical_output": not mismatches,
+        "mismatches": mismatches,
+        "speedup": results["lxml"]["pages_per_second"] / results["legacy"]["pages_per_second"],
+        "parsers": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(measure(args.worker, args.rounds)))
+        return 0
+
+    result = run(args.rounds)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"{result['fixtures']} fixtures, identical output: {result['identical_output']}")
+        for name, stats in result["parsers"].items():
+            print(f"{name:>7}: {stats['pages_per_second']:8.1f} pages/s, {stats['mean_ms']:6.2f} ms/page, peak +{stats['peak_memory_kb'] / 1024:.2f} MB ({stats['memory']})")
+        print(f"speedup: {result['speedup']:.1f}x")
+    if not result["identical_output"]:
+        print(f"FAIL: output differs for {', '.join(result['mismatches'])}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
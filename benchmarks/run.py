@@ -0,0 +1,419 @@
+"""Offline benchmark suite for the refresh pipeline and the API.
+
+    python -m benchmarks.run [--only parse,catalog,refresh_http,refresh_selenium,db_write,api]
+                             [--output results.json] [--baseline previous.json] [--tolerance 0.5]
+
+Nothing leaves the machine: the class search and the catalog are served from
+benchmarks/fixtures by benchmarks.stub_server, the Selenium engine drives
+benchmarks.fake_webdriver, and the database is a fresh SQLite file. Measures
+per-page parse time, catalog sync time, end-to-end refresh time for both
+scraper engines (cold, then with nothing changed), rows per second written
+into SQLite, and API latency and throughput under concurrent clients.
+
+Results are written as JSON (benchmarks/results/<time>.json by default) with
+one check per limit in benchmarks/thresholds.json. With --baseline, each
+thresholded metric not marked "baseline": false is also compared with the
+same metric in an earlier results file, and fails if it got worse by more
+than --tolerance (a fraction; the default allows for a shared machine, tighten
+it on a quiet one). The exit status is 1 if any check fails, so a change can
+be compared before and after on a machine with no network.
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from urllib.parse import quote
+
+from benchmarks.generate_fixtures import PISA_DIR, SELECTED_TERM
+from benchmarks.stub_server import StubServer
+from benchmarks.typeahead_load import percentile, summarize
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+THRESHOLDS = os.path.join(os.path.dirname(__file__), "thresholds.json")
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+CATALOG_FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "catalog", "*.html")
+BENCHMARKS = ("parse", "catalog", "refresh_http", "refresh_selenium", "db_write", "api")
+SELENIUM_TERM = "2250"  # a second term, so the Selenium run starts from an empty table too
+DB_WRITE_TERM = "2244"
+
+
+def environment(workdir, server):
+    # Must run before app is imported: the scrapers read these at import time
+    os.environ.update(
+        DATABASE_URL="sqlite:///" + os.path.join(workdir, "bench.db"),
+        PISA_CLASS_SEARCH_URL=server.class_search_url,
+        CATALOG_URL=server.url,
+        CATALOG_CACHE_DIR=os.path.join(workdir, "http_cache"),
+        CATALOG_OFFLINE="",
+        REFRESHER_LOCK=os.path.join(workdir, "refresher.lock"),
+        PROFILE_FLAG=os.path.join(workdir, "profile-next-refresh"),
+    )
+    import app as course_app
+    course_app.create_db()
+    course_app.discover_terms()
+    return course_app
+
+
+def sample_value(name, labels):
+    from prometheus_client import REGISTRY
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - started, result
+
+
+def bench_parse(rounds=20):
+    from src.services.class_search_parser import parse_document, parse_results_page
+    from src.services.major_courses import parse_courses_from_page
+
+    pages = []
+    for path in sorted(glob.glob(os.path.join(PISA_DIR, "*-*.html"))):
+        with open(path, "rb") as f:
+            pages.append(f.read())
+    page_samples, page_best, rows = [], [], 0
+    for content in pages:
+        samples = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            rows += len(parse_results_page(parse_document(content), ge="CC"))
+            samples.append(time.perf_counter() - started)
+        page_samples.extend(samples)
+        page_best.append(min(samples))
+
+    catalog_samples, catalog_best = [], []
+    for path in sorted(glob.glob(CATALOG_FIXTURES)):
+        with open(path, "rb") as f:
+            content = f.read()
+        samples = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            parse_courses_from_page(content)
+            samples.append(time.perf_counter() - started)
+        catalog_samples.extend(samples)
+        catalog_best.append(min(samples))
+
+    # p50 is the median page's best-of-rounds time, which barely moves
+    # between runs on a busy machine; p99 keeps the tail of every sample
+    return {
+        "pisa_pages": len(pages),
+        "pisa_page_p50_ms": percentile(page_best, 0.5) * 1000,
+        "pisa_page_p99_ms": percentile(page_samples, 0.99) * 1000,
+        "pisa_rows_per_second": rows / sum(page_samples),
+        "catalog_page_p50_ms": percentile(catalog_best, 0.5) * 1000,
+        "catalog_page_p99_ms": percentile(catalog_samples, 0.99) * 1000,
+    }
+
+
+def bench_catalog(course_app, server):
+    requests_before = server.requests
+    cold_seconds, _ = timed(course_app.update_all_courses)
+    cold_requests = server.requests - requests_before
+    not_modified_before = server.not_modified
+    warm_seconds, _ = timed(course_app.update_all_courses)
+    return {
+        "degrees": len(course_app.current_degree_model()),
+        "cold_seconds": cold_seconds,
+        "cold_requests": cold_requests,
+        "warm_seconds": warm_seconds,
+        "warm_not_modified": server.not_modified - not_modified_before,
+    }
+
+
+def refresh(course_app, server, term):
+    requests_before = server.requests
+    db_before = sample_value("ucsc_db_write_seconds_sum", {"term": term})
+    seconds, _ = timed(course_app.store_courses_in_db, None, [term])
+    with course_app.app.app_context():
+        sections = course_app.CourseModel.query.filter(course_app.CourseModel.term == term).count()
+    return seconds, sections, server.requests - requests_before, sample_value("ucsc_db_write_seconds_sum", {"term": term}) - db_before
+
+
+def refresh_result(cold, warm):
+    seconds, sections, requests, db_seconds = cold
+    return {
+        "sections": sections,
+        "cold_seconds": seconds,
+        "cold_requests": requests,
+        "cold_db_seconds": db_seconds,
+        "sections_per_second": sections / seconds,
+        "warm_seconds": warm[0],
+        "warm_db_seconds": warm[3],
+    }
+
+
+def bench_refresh_http(course_app, server):
+    from src.services import ucsc_courses
+    ucsc_courses.SCRAPER_ENGINE = "http"
+    cold = refresh(course_app, server, SELECTED_TERM)
+    warm = refresh(course_app, server, SELECTED_TERM)
+    return refresh_result(cold, warm)
+
+
+def bench_refresh_selenium(course_app, server, command_latency_ms):
+    from benchmarks.fake_webdriver import FakeWebDriver
+    from src.services import ucsc_courses
+
+    ucsc_courses.driver_manager.create_driver = lambda: FakeWebDriver(command_latency_ms)
+    ucsc_courses.SCRAPER_ENGINE = "selenium"
+    with course_app.app.app_context():
+        course_app.add_term(SELENIUM_TERM)
+        course_app.db.session.commit()
+    course_app.load_terms()
+    try:
+        cold = refresh(course_app, server, SELENIUM_TERM)
+        warm = refresh(course_app, server, SELENIUM_TERM)
+    finally:
+        ucsc_courses.SCRAPER_ENGINE = "http"
+        ucsc_courses.driver_manager.close_all()
+    return dict(refresh_result(cold, warm), command_latency_ms=command_latency_ms)
+
+
+def synthetic_courses(count, rng, churn=0.0, previous=None):
+    from src.services.course import Course
+    from benchmarks.typeahead_load import synthetic_rows
+
+    rows = previous or synthetic_rows(count)
+    courses = []
+    for row in rows:
+        if churn and rng.random() < churn:
+            row["class_count"] = f"{rng.randint(0, 40)}/40"
+        courses.append(Course(
+            row["code"], row["name"], row["instructor"], row["link"], row["class_count"],
+            row["enroll_num"], row["class_type"], row["schedule"], row["location"], ge="CC",
+        ))
+    return rows, courses
+
+
+def bench_db_write(course_app, sections):
+    rng = random.Random(3)
+    rows, courses = synthetic_courses(sections, rng)
+    insert_seconds, inserted = timed(course_app.write_category, DB_WRITE_TERM, "CC", courses)
+    rows, courses = synthetic_courses(sections, rng, churn=0.1, previous=rows)
+    update_seconds, updated = timed(course_app.write_category, DB_WRITE_TERM, "CC", courses)
+    unchanged_seconds, _ = timed(course_app.write_category, DB_WRITE_TERM, "CC", courses)
+    return {
+        "sections": sections,
+        "insert_seconds": insert_seconds,
+        "insert_rows_per_second": inserted.inserted / insert_seconds,
+        "update_seconds": update_seconds,
+        "updated_rows": updated.updated,
+        "unchanged_seconds": unchanged_seconds,
+    }
+
+
+def api_requests(course_app):
+    snapshot = course_app.current_course_snapshot()
+    model = course_app.current_degree_model()
+    degrees = [quote(name.replace("/", "-")) for name in model.requirements][:8]
+    codes = sorted({row["code"].split(" - ")[0] for row in snapshot.rows})
+    etag = course_app.courses_response(snapshot, "AnyGE").etag
+    since = max(snapshot.generation - 3, 0)
+    # (name, path, headers, weight): roughly what the app sends while browsing
+    return [
+        ("courses", "/api/courses", {}, 6),
+        ("courses_not_modified", "/api/courses", {"If-None-Match": f'"{etag}"'}, 6),
+        ("courses_ge", "/api/courses?course=CC", {}, 4),
+        ("courses_query", "/api/courses?open=1&class_type=In%20Person&limit=50", {}, 3),
+        ("courses_busy", "/api/courses?busy=MWF%209:00AM-10:30AM&limit=50", {}, 2),
+        ("changes", f"/api/courses/changes?since={since}", {}, 2),
+        ("search", [f"/api/search?q={code[:n]}" for code in codes[:40] for n in (2, 4, len(code))], {}, 8),
+        ("degrees", "/api/degrees", {}, 1),
+        ("degree_sections", [f"/api/degrees/{name}/sections" for name in degrees], {}, 2),
+        ("last_update", "/api/last_update", {}, 1),
+    ]
+
+
+def bench_api(course_app, threads, total):
+    import logging
+    import requests
+    from werkzeug.serving import make_server
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    course_app.load_read_models()
+    server = make_server("127.0.0.1", 0, course_app.app, threaded=True)
+    threading.Thread(target=server.serve_forever, name="api-server", daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    plan = api_requests(course_app)
+    rng = random.Random(9)
+    names = rng.choices([name for name, *_ in plan], weights=[weight for *_, weight in plan], k=total)
+    by_name = {name: (path, headers) for name, path, headers, _ in plan}
+    work = []
+    for name in names:
+        path, headers = by_name[name]
+        work.append((name, rng.choice(path) if isinstance(path, list) else path, headers))
+
+    samples = {name: [] for name, *_ in plan}
+    errors = []
+    lock = threading.Lock()
+
+    def client(chunk):
+        session = requests.Session()
+        local = []
+        for name, path, headers in chunk:
+            started = time.perf_counter()
+            response = session.get(base + path, headers=headers)
+            local.append((name, time.perf_counter() - started, response.status_code))
+        session.close()
+        with lock:
+            for name, seconds, status in local:
+                samples[name].append(seconds)
+                if status not in (200, 304):
+                    errors.append((name, status))
+
+    workers = [threading.Thread(target=client, args=(work[i::threads],)) for i in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    server.shutdown()
+
+    everything = [seconds for values in samples.values() for seconds in values]
+    result = {
+        "threads": threads,
+        "requests": len(everything),
+        "errors": len(errors),
+        "requests_per_second": len(everything) / elapsed,
+        "p50_ms": percentile(everything, 0.5) * 1000,
+        "p99_ms": percentile(everything, 0.99) * 1000,
+    }
+    result["endpoints"] = {name: summarize(values) for name, values in samples.items() if values}
+    return result
+
+
+def flatten(results):
+    flat = {}
+    for bench, metrics in results.items():
+        for name, value in metrics.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                flat[f"{bench}.{name}"] = value
+    return flat
+
+
+def checks(results, thresholds, baseline=None, tolerance=0.5):
+    flat = flatten(results)
+    previous = flatten(baseline["results"]) if baseline else {}
+    found = []
+    for metric, limit in thresholds.items():
+        if metric not in flat:
+            continue
+        value = flat[metric]
+        for kind in ("max", "min"):
+            if kind in limit:
+                ok = value <= limit[kind] if kind == "max" else value >= limit[kind]
+                found.append({"metric": metric, "value": value, kind: limit[kind], "ok": ok})
+        # Tail latencies are too noisy run to run for a relative check
+        if metric in previous and limit.get("baseline", True):
+            if "max" in limit:
+                bound = previous[metric] * (1 + tolerance)
+                found.append({"metric": metric, "value": value, "baseline_max": bound, "ok": value <= bound})
+            else:
+                bound = previous[metric] * (1 - tolerance)
+                found.append({"metric": metric, "value": value, "baseline_min": bound, "ok": value >= bound})
+    return found
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(only=BENCHMARKS, latency_ms=20.0, command_latency_ms=5.0, sections=5000, threads=8, requests=3000):
+    workdir = tempfile.mkdtemp(prefix="ucsc-bench-")
+    server = StubServer(latency_ms=latency_ms).start()
+    results = {}
+    try:
+        course_app = environment(workdir, server)
+        if "parse" in only:
+            results["parse"] = bench_parse()
+        # The API benchmark serves what the catalog and refresh runs stored
+        if "catalog" in only or "api" in only:
+            results["catalog"] = bench_catalog(course_app, server)
+        if "refresh_http" in only or "api" in only:
+            results["refresh_http"] = bench_refresh_http(course_app, server)
+        if "refresh_selenium" in only:
+            results["refresh_selenium"] = bench_refresh_selenium(course_app, server, command_latency_ms)
+        if "db_write" in only:
+            results["db_write"] = bench_db_write(course_app, sections)
+        if "api" in only:
+            results["api"] = bench_api(course_app, threads, requests)
+    finally:
+        server.stop()
+    return {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "config": {
+            "latency_ms": latency_ms,
+            "command_latency_ms": command_latency_ms,
+            "sections": sections,
+            "threads": threads,
+            "requests": requests,
+        },
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", help="comma-separated benchmarks to run (default: all)")
+    parser.add_argument("--output", help="where to write the JSON results")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed regression against the baseline")
+    parser.add_argument("--thresholds", default=THRESHOLDS)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="stub server delay per response")
+    parser.add_argument("--command-latency-ms", type=float, default=5.0, help="fake WebDriver delay per command")
+    parser.add_argument("--sections", type=int, default=5000, help="rows written by the db_write benchmark")
+    parser.add_argument("--threads", type=int, default=8, help="concurrent API clients")
+    parser.add_argument("--requests", type=int, default=3000, help="API requests in total")
+    args = parser.parse_args(argv)
+
+    only = tuple(name.strip() for name in args.only.split(",")) if args.only else BENCHMARKS
+    unknown = [name for name in only if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+
+    result = run(only, args.latency_ms, args.command_latency_ms, args.sections, args.threads, args.requests)
+    with open(args.thresholds) as f:
+        thresholds = json.load(f)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    result["checks"] = checks(result["results"], thresholds, baseline, args.tolerance)
+    result["ok"] = all(check["ok"] for check in result["checks"])
+
+    output = args.output or os.path.join(RESULTS_DIR, datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+
+    for metric, value in flatten(result["results"]).items():
+        print(f"{metric:45} {value:12.3f}" if isinstance(value, float) else f"{metric:45} {value:12d}")
+    failed = [check for check in result["checks"] if not check["ok"]]
+    for check in failed:
+        limit = next(f"{key} {value:.3f}" for key, value in check.items() if key not in ("metric", "value", "ok"))
+        print(f"FAIL: {check['metric']} = {check['value']:.3f} ({limit})")
+    print(f"{'OK' if not failed else 'FAIL'}: {len(result['checks']) - len(failed)}/{len(result['checks'])} checks passed; results in {output}")
+    return 0 if not failed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
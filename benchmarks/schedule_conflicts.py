@@ -0,0 +1,107 @@
+"""Time-conflict filtering over the schedule bitmasks.
+
+    python -m benchmarks.schedule_conflicts [--sections 5000] [--budget-us 200]
+
+Builds the per-snapshot masks for synthetic sections, then times checking
+every section against random busy timetables, both with the vectorized masks
+and with the row-by-row parse a client would otherwise do. The budget applies
+to the conflict check itself; turning the result into a list of positions is
+reported separately.
+"""
+import argparse
+import random
+import sys
+import time
+
+from benchmarks.typeahead_load import percentile, synthetic_rows
+from src.services.schedule import parse_schedule
+from src.services.schedule_mask import ScheduleMasks, parse_busy
+
+BUSY_SLOTS = [
+    "MWF 9:00AM-10:05AM", "MWF 11:00AM-12:05PM", "MWF 2:40PM-3:45PM",
+    "TuTh 9:50AM-11:25AM", "TuTh 1:30PM-3:05PM", "TuTh 5:20PM-6:55PM",
+    "M 7:10PM-9:45PM", "W 12:00PM-1:30PM", "F 8:00AM-12:00PM",
+]
+
+
+def row_by_row(rows, busy_meetings):
+    fitting = []
+    for position, row in enumerate(rows):
+        meeting = parse_schedule(row["schedule"])
+        if meeting is None:
+            fitting.append(position)
+            continue
+        days, start, end = meeting
+        if not any(
+            set(days) & set(busy_days) and start < busy_end and busy_start < end
+            for busy_days, busy_start, busy_end in busy_meetings
+        ):
+            fitting.append(position)
+    return fitting
+
+
+def run(sections=5000, queries=2000, seed=5):
+    rng = random.Random(seed)
+    rows = synthetic_rows(sections)
+    schedules = ["MWF 9:20AM-10:25AM", "TuTh 11:40AM-1:15PM", "MWF 2:40PM-3:45PM", "TuTh 5:20PM-6:55PM", "TBA"]
+    for row in rows:
+        row["schedule"] = rng.choice(schedules)
+
+    started = time.perf_counter()
+    masks = ScheduleMasks(rows)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    timetables = ["; ".join(rng.sample(BUSY_SLOTS, rng.randint(1, 4))) for _ in range(queries)]
+    busy_masks = [parse_busy(text) for text in timetables]
+    samples = []
+    for busy in busy_masks:
+        started = time.perf_counter()
+        masks.conflicts(busy)
+        samples.append(time.perf_counter() - started)
+    listed = []
+    for busy in busy_masks:
+        started = time.perf_counter()
+        masks.fitting(busy)
+        listed.append(time.perf_counter() - started)
+
+    baseline = []
+    for text in timetables[:50]:
+        busy_meetings = [parse_schedule(part.strip()) for part in text.split(";")]
+        started = time.perf_counter()
+        expected = row_by_row(rows, busy_meetings)
+        baseline.append(time.perf_counter() - started)
+        if expected != masks.fitting(parse_busy(text)):
+            raise AssertionError(f"bitmask result differs from row-by-row parse for {text!r}")
+
+    return {
+        "sections": sections,
+        "build_ms": build_ms,
+        "mask_p50_us": percentile(samples, 0.5) * 1e6,
+        "mask_p99_us": percentile(samples, 0.99) * 1e6,
+        "fitting_p50_us": percentile(listed, 0.5) * 1e6,
+        "row_by_row_p50_us": percentile(baseline, 0.5) * 1e6,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sections", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--budget-us", type=float, default=200.0)
+    args = parser.parse_args(argv)
+
+    result = run(args.sections, args.queries)
+    print(f"Built masks for {result['sections']} sections in {result['build_ms']:.1f} ms")
+    print(f"Bitmask check:  p50 {result['mask_p50_us']:.0f} us, p99 {result['mask_p99_us']:.0f} us")
+    print(f"With positions: p50 {result['fitting_p50_us']:.0f} us")
+    print(f"Row-by-row:     p50 {result['row_by_row_p50_us']:.0f} us")
+
+    if result["mask_p99_us"] > args.budget_us:
+        print(f"FAIL: p99 conflict check {result['mask_p99_us']:.0f} us exceeds {args.budget_us} us")
+        return 1
+    print(f"OK: p99 conflict check within {args.budget_us} us")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""Time from process start to the first served request.
+
+    python -m benchmarks.startup_time [--server python|gunicorn] [--db instance/courses.db] [--budget-s 10]
+
+Starts the API on a copy of an existing database with the scrapers pointed at
+an unreachable address, so the background refresh cannot help, and measures
+how long it takes until /api/courses and /api/ready answer. The copy is left
+at whatever schema it has, so the time includes the startup migration.
+"""
+import argparse
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DB = os.path.join(ROOT, "instance", "courses.db")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def status(url):
+    try:
+        with urllib.request.urlopen(url, timeout=2) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except (urllib.error.URLError, OSError):
+        return None
+
+
+def run(server="python", db=DEFAULT_DB, timeout=120.0):
+    workdir = tempfile.mkdtemp()
+    db_path = os.path.join(workdir, "courses.db")
+    shutil.copy(db, db_path)
+    port = free_port()
+    env = dict(
+        os.environ,
+        DATABASE_URL="sqlite:///" + db_path,
+        PORT=str(port),
+        PYTHONPATH=ROOT,
+        PISA_CLASS_SEARCH_URL="http://127.0.0.1:9/class_search/index.php",
+        CATALOG_OFFLINE="1",
+        CATALOG_CACHE_DIR=os.path.join(workdir, "http_cache"),
+        REFRESHER_LOCK=os.path.join(workdir, "refresher.lock"),
+    )
+    if server == "gunicorn":
+        command = [sys.executable, "-m", "gunicorn", "app:app"]
+    else:
+        command = [sys.executable, "app.py"]
+
+    base = f"http://127.0.0.1:{port}"
+    timings = {}
+    started = time.perf_counter()
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while len(timings) < 2 and time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"server exited with code {process.returncode}")
+            for name, path in (("first_request_s", "/api/courses"), ("ready_s", "/api/ready")):
+                if name not in timings and status(base + path) == 200:
+                    timings[name] = time.perf_counter() - started
+            time.sleep(0.05)
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            # In-flight scrape retries can hold up a graceful shutdown
+            process.kill()
+            process.wait()
+        shutil.rmtree(workdir, ignore_errors=True)
+    return dict(timings, server=server)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server", choices=["python", "gunicorn"], default="python")
+    parser.add_argument("--db", default=DEFAULT_DB)
+    parser.add_argument("--budget-s", type=float, default=10.0)
+    args = parser.parse_args(argv)
+
+    result = run(args.server, args.db, timeout=max(args.budget_s * 3, 30))
+    first = result.get("first_request_s")
+    ready = result.get("ready_s")
+    print(f"{args.server}: first request after {first:.2f} s" if first else f"{args.server}: no successful request")
+    print(f"{args.server}: ready after {ready:.2f} s" if ready else f"{args.server}: never reported ready")
+
+    if first is None or first > args.budget_s:
+        print(f"FAIL: time to first request over {args.budget_s} s")
+        return 1
+    print(f"OK: time to first request within {args.budget_s} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
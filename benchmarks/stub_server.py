@@ -0,0 +1,159 @@
+"""Local stand-in for pisa.ucsc.edu and catalog.ucsc.edu, serving the fixtures.
+
+    python -m benchmarks.stub_server [--port 8765] [--latency-ms 20]
+
+Then point the app at it:
+
+    PISA_CLASS_SEARCH_URL=http://127.0.0.1:8765/class_search/index.php
+    CATALOG_URL=http://127.0.0.1:8765/
+
+The class search answers the form GET, the "results" POST and each "next"
+POST from benchmarks/fixtures/pisa, paging by rec_start like the real site.
+Catalog pages carry an ETag and answer If-None-Match with 304. Every
+response waits latency_ms first, standing in for the network.
+"""
+import argparse
+import hashlib
+import os
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks.generate_fixtures import (
+    CATALOG_DIR,
+    CATALOG_LISTING,
+    DEGREES_PATH,
+    PAGE_SIZE,
+    PISA_DIR,
+    TERMS,
+)
+
+CLASS_SEARCH_PATH = "/class_search/index.php"
+
+
+def read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.server.wait()
+        path = re.sub("/+", "/", urlsplit(self.path).path)
+        if path == CLASS_SEARCH_PATH:
+            return self.send(200, self.server.page(os.path.join(PISA_DIR, "search.html")))
+        if path == DEGREES_PATH:
+            return self.send_cacheable(CATALOG_LISTING)
+        if path.startswith(DEGREES_PATH):
+            return self.send_cacheable(os.path.join(CATALOG_DIR, path[len(DEGREES_PATH):].strip("/") + ".html"))
+        self.send(404, b"not found")
+
+    def do_POST(self):
+        self.server.wait()
+        if re.sub("/+", "/", urlsplit(self.path).path) != CLASS_SEARCH_PATH:
+            return self.send(404, b"not found")
+        length = int(self.headers.get("Content-Length", 0))
+        fields = {key: values[-1] for key, values in parse_qs(self.rfile.read(length).decode("utf-8")).items()}
+        self.send(200, self.server.results(fields))
+
+    def send_cacheable(self, path):
+        body = self.server.page(path)
+        if body is None:
+            return self.send(404, b"not found")
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            return self.send(304, b"", {"ETag": etag})
+        self.send(200, body, {"ETag": etag})
+
+    def send(self, status, body, headers=None):
+        self.server.count(status)
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body) if status != 304 else 0))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(body)
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port=0, latency_ms=20.0):
+        super().__init__(("127.0.0.1", port), StubHandler)
+        self.latency = latency_ms / 1000
+        self.pages = {}
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.not_modified = 0
+        self.thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/"
+
+    @property
+    def class_search_url(self):
+        return self.url.rstrip("/") + CLASS_SEARCH_PATH
+
+    def wait(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def count(self, status):
+        with self.lock:
+            self.requests += 1
+            self.not_modified += status == 304
+
+    def page(self, path):
+        # Fixtures are read once and served from memory
+        if path not in self.pages:
+            self.pages[path] = read(path) if os.path.exists(path) else None
+        return self.pages[path]
+
+    def results(self, fields):
+        ge = fields.get("binds[:ge]", "")
+        if fields.get("binds[:term]") not in {code for code, _ in TERMS}:
+            ge = ""
+        page = 0
+        if fields.get("action") == "next":
+            page = int(fields.get("rec_start", 0)) // int(fields.get("rec_dur", PAGE_SIZE)) + 1
+        body = self.page(os.path.join(PISA_DIR, f"{ge}-{page}.html")) if ge else None
+        # Past the last page (or an unknown category) the site shows the empty form
+        return body if body is not None else self.page(os.path.join(PISA_DIR, "search.html"))
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever, name="stub-server", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    args = parser.parse_args(argv)
+
+    server = StubServer(args.port, args.latency_ms)
+    print(f"Serving class search at {server.class_search_url} and the catalog at {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+"""Typeahead load test for /api/search.
+
+    python -m benchmarks.typeahead_load [--sections 5000] [--threads 8] [--budget-ms 10]
+
+Replays keystroke-by-keystroke queries (including typos) against a synthetic
+snapshot and fails if the p99 search latency is over budget.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+SUBJECTS = [
+    "ANTH", "ART", "ASTR", "BIOE", "BIOL", "CHEM", "CMPM", "CRES", "CSE", "ECON",
+    "EDUC", "ENVS", "FILM", "HAVC", "HIS", "LGST", "LIT", "MATH", "MUSC", "PHIL",
+    "PHYS", "POLI", "PSYC", "SOCY", "SPAN", "STAT", "THEA", "WRIT",
+]
+WORDS = [
+    "Introduction", "Advanced", "Topics", "History", "Programming", "Python", "Calculus",
+    "Analysis", "Literature", "Culture", "Society", "Environmental", "Systems", "Design",
+    "Theory", "Methods", "Modern", "Ancient", "World", "American", "Digital", "Media",
+    "Ethics", "Politics", "Economics", "Statistics", "Biology", "Chemistry", "Physics",
+    "Writing", "Rhetoric", "Music", "Film", "Art", "Games", "Global", "Race", "Gender",
+]
+LAST_NAMES = [
+    "Tantalo", "Smith", "Garcia", "Nguyen", "Kim", "Patel", "Johnson", "Lee", "Brown",
+    "Martinez", "Chen", "Wilson", "Anderson", "Taylor", "Thomas", "Moore", "Jackson",
+    "Berrahmoun", "Rohmer", "Ahrends", "Perez", "Kyo", "Staff",
+]
+GE_CATEGORIES = ["CC", "ER", "IM", "MF", "SI", "SR", "TA", "PE-E", "PE-H", "PE-T", "PR-E", "PR-C", "PR-S", "C1", "C2"]
+
+
+def synthetic_rows(count, seed=7):
+    rng = random.Random(seed)
+    rows = []
+    for n in range(count):
+        subject = rng.choice(SUBJECTS)
+        number = f"{rng.randint(1, 199)}{rng.choice(['', '', '', 'A', 'B', 'L'])}"
+        rows.append({
+            "ge": rng.choice(GE_CATEGORIES),
+            "code": f"{subject} {number} - {rng.randint(1, 4):02d}",
+            "name": " ".join(rng.sample(WORDS, rng.randint(2, 4))),
+            "instructor": f"{rng.choice('ABCDEFGHJKLMNPRSTW')}. {rng.choice(LAST_NAMES)}",
+            "link": "https://pisa.ucsc.edu/class_search/index.php",
+            "class_count": f"{rng.randint(0, 40)}/40",
+            "enroll_num": 10000 + n,
+            "class_type": rng.choice(["In Person", "Asynchronous Online", "Hybrid"]),
+            "schedule": rng.choice(["MWF 10:40AM-11:45AM", "TuTh 01:30PM-03:05PM", "TBA"]),
+            "location": "LEC: Thim Lecture 003",
+        })
+    return rows
+
+
+def typo(word, rng):
+    if len(word) < 4:
+        return word
+    i = rng.randint(1, len(word) - 2)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def keystroke_queries(rows, sessions, seed=11):
+    # Every prefix of a typed query is sent, as the app does while the user types
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(sessions):
+        row = rng.choice(rows)
+        kind = rng.random()
+        if kind < 0.4:
+            text = row["code"].split(" - ")[0]
+        elif kind < 0.7:
+            text = " ".join(row["name"].split()[:2])
+        elif kind < 0.85:
+            text = row["instructor"].split()[-1]
+        else:
+            text = typo(rng.choice(row["name"].split()), rng)
+        queries.extend(text[:i] for i in range(1, len(text) + 1))
+    return queries
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(samples):
+    return {
+        "count": len(samples),
+        "p50_ms": statistics.median(samples) * 1000,
+        "p95_ms": percentile(samples, 0.95) * 1000,
+        "p99_ms": percentile(samples, 0.99) * 1000,
+        "max_ms": max(samples) * 1000,
+    }
+
+
+def run(sections=5000, sessions=400, threads=8, budget_ms=10.0):
+    os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db"))
+    import app as course_app
+    from src.services.search_index import SearchIndex
+    from src.services.snapshot import CourseSnapshot
+
+    rows = synthetic_rows(sections)
+    started = time.perf_counter()
+    index = SearchIndex(rows)
+    build_seconds = time.perf_counter() - started
+
+    queries = keystroke_queries(rows, sessions)
+    index_samples = []
+    for query in queries:
+        started = time.perf_counter()
+        index.search(query, limit=20)
+        index_samples.append(time.perf_counter() - started)
+
+    course_app.course_snapshots.publish(CourseSnapshot(1, rows))
+    endpoint_samples = []
+    lock = threading.Lock()
+
+    def client_worker(worker_queries):
+        client = course_app.app.test_client()
+        local = []
+        for query in worker_queries:
+            started = time.perf_counter()
+            response = client.get("/api/search", query_string={"q": query, "limit": 20})
+            local.append(time.perf_counter() - started)
+            assert response.status_code == 200
+        with lock:
+            endpoint_samples.extend(local)
+
+    workers = [
+        threading.Thread(target=client_worker, args=(queries[i::threads],))
+        for i in range(threads)
+    ]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+
+    return {
+        "sections": sections,
+        "queries": len(queries),
+        "index_build_ms": build_seconds * 1000,
+        "index": summarize(index_samples),
+        "endpoint": dict(summarize(endpoint_samples), threads=threads, requests_per_second=len(endpoint_samples) / elapsed),
+        "budget_ms": budget_ms,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sections", type=int, default=5000)
+    parser.add_argument("--sessions", type=int, default=400)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--budget-ms", type=float, default=10.0)
+    args = parser.parse_args(argv)
+
+    result = run(args.sections, args.sessions, args.threads, args.budget_ms)
+    index = result["index"]
+    endpoint = result["endpoint"]
+    print(f"Indexed {result['sections']} sections in {result['index_build_ms']:.1f} ms")
+    print(f"Search  ({index['count']} queries): p50 {index['p50_ms']:.3f} ms, p95 {index['p95_ms']:.3f} ms, p99 {index['p99_ms']:.3f} ms, max {index['max_ms']:.3f} ms")
+    print(f"HTTP    ({endpoint['threads']} threads): p50 {endpoint['p50_ms']:.3f} ms, p99 {endpoint['p99_ms']:.3f} ms, {endpoint['requests_per_second']:.0f} req/s")
+
+    if index["p99_ms"] > args.budget_ms:
+        print(f"FAIL: p99 search latency {index['p99_ms']:.3f} ms exceeds {args.budget_ms} ms")
+        return 1
+    print(f"OK: p99 search latency within {args.budget_ms} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,24 @@
+# Loaded automatically by `gunicorn app:app` (see Procfile)
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5001)}"
+
+# /api/courses/stream (Server-Sent Events) holds a connection open for up to
+# SSE_MAX_DURATION seconds. The default sync worker would be killed by the
+# master after `timeout` seconds of one such request, taking the leader's
+# scraper and scheduler with it, so SSE needs a threaded (or async) worker.
+# Each open stream occupies one thread.
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 32))
+
+
+def post_worker_init(worker):
+    # Threads do not survive the fork, so each worker starts its own background work
+    from app import bootstrap
+    bootstrap()
+
+
+def child_exit(server, worker):
+    # prometheus_client multiprocess cleanup; does nothing without PROMETHEUS_MULTIPROC_DIR
+    from src.services.metrics import mark_process_dead
+    mark_process_dead(worker.pid)
@@ -1,7 +1,7 @@
 import logging
 from logging.config import fileConfig
 
-from flask import current_app
+from flask import current_app, g
 
 from alembic import context
 
@@ -11,7 +11,9 @@ config = context.config
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
-fileConfig(config.config_file_name)
+# The app's own migration on startup (create_db) leaves its logging alone
+if not g.get('startup_migration'):
+    fileConfig(config.config_file_name)
 logger = logging.getLogger('alembic.env')
 
 
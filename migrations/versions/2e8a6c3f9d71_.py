@@ -0,0 +1,35 @@
+"""enrollment history
+
+Revision ID: 2e8a6c3f9d71
+Revises: 9c4f1a7e2b60
+Create Date: 2026-10-18 16:48:33.915620
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2e8a6c3f9d71'
+down_revision = '9c4f1a7e2b60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('enrollment_history',
+    sa.Column('enroll_num', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('start', sa.Integer(), nullable=False),
+    sa.Column('times', sa.LargeBinary(), nullable=False),
+    sa.Column('opens', sa.LargeBinary(), nullable=False),
+    sa.Column('totals', sa.LargeBinary(), nullable=False),
+    sa.Column('last_time', sa.Integer(), nullable=False),
+    sa.Column('last_open', sa.Integer(), nullable=False),
+    sa.Column('last_total', sa.Integer(), nullable=False),
+    sa.Column('samples', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('enroll_num')
+    )
+
+
+def downgrade():
+    op.drop_table('enrollment_history')
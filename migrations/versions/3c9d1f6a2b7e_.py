@@ -0,0 +1,32 @@
+"""add snapshot table
+
+Revision ID: 3c9d1f6a2b7e
+Revises: 07e898b377bc
+Create Date: 2026-10-18 09:12:41.511203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c9d1f6a2b7e'
+down_revision = '07e898b377bc'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('snapshot',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('row_count', sa.Integer(), nullable=False),
+    sa.Column('inserted', sa.Integer(), nullable=False),
+    sa.Column('updated', sa.Integer(), nullable=False),
+    sa.Column('deleted', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('snapshot')
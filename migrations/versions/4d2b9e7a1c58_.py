@@ -0,0 +1,139 @@
+"""terms
+
+Revision ID: 4d2b9e7a1c58
+Revises: 2e8a6c3f9d71
+Create Date: 2026-10-18 17:48:13.905316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4d2b9e7a1c58'
+down_revision = '2e8a6c3f9d71'
+branch_labels = None
+depends_on = None
+
+# Everything stored before terms were tracked was scraped for Fall 2024
+LEGACY_TERM = '2248'
+LEGACY_TERM_NAME = 'Fall Quarter 2024'
+
+
+def upgrade():
+    op.create_table('term',
+    sa.Column('code', sa.String(length=4), nullable=False),
+    sa.Column('name', sa.String(length=50), nullable=True),
+    sa.Column('frozen', sa.Boolean(), nullable=False),
+    sa.Column('added_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('code')
+    )
+    op.execute(
+        "INSERT INTO term (code, name, frozen, added_at) "
+        f"SELECT '{LEGACY_TERM}', '{LEGACY_TERM_NAME}', 0, CURRENT_TIMESTAMP "
+        "WHERE EXISTS (SELECT 1 FROM course_model)"
+    )
+
+    for table in ('course_model', 'snapshot', 'section_change'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('term', sa.String(length=4), nullable=True))
+        op.execute(f"UPDATE {table} SET term = '{LEGACY_TERM}'")
+    for table in ('course_model', 'snapshot'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.create_index(batch_op.f(f'ix_{table}_term'), ['term'], unique=False)
+
+    # Both keys gain the term, so the tables are rebuilt with the rows copied over
+    op.create_table('category_checkpoint_new',
+    sa.Column('term', sa.String(length=4), nullable=False),
+    sa.Column('ge', sa.String(length=5), nullable=False),
+    sa.Column('row_count', sa.Integer(), nullable=False),
+    sa.Column('digest', sa.String(length=40), nullable=True),
+    sa.Column('succeeded_at', sa.DateTime(), nullable=True),
+    sa.Column('attempted_at', sa.DateTime(), nullable=True),
+    sa.Column('failures', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.String(length=200), nullable=True),
+    sa.Column('rejected_count', sa.Integer(), nullable=True),
+    sa.Column('rejections', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('term', 'ge')
+    )
+    op.execute(
+        "INSERT INTO category_checkpoint_new "
+        f"SELECT '{LEGACY_TERM}', ge, row_count, digest, succeeded_at, attempted_at, failures, "
+        "last_error, rejected_count, rejections FROM category_checkpoint"
+    )
+    op.drop_table('category_checkpoint')
+    op.rename_table('category_checkpoint_new', 'category_checkpoint')
+
+    op.create_table('enrollment_history_new',
+    sa.Column('term', sa.String(length=4), nullable=False),
+    sa.Column('enroll_num', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('start', sa.Integer(), nullable=False),
+    sa.Column('times', sa.LargeBinary(), nullable=False),
+    sa.Column('opens', sa.LargeBinary(), nullable=False),
+    sa.Column('totals', sa.LargeBinary(), nullable=False),
+    sa.Column('last_time', sa.Integer(), nullable=False),
+    sa.Column('last_open', sa.Integer(), nullable=False),
+    sa.Column('last_total', sa.Integer(), nullable=False),
+    sa.Column('samples', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('term', 'enroll_num')
+    )
+    op.execute(
+        "INSERT INTO enrollment_history_new "
+        f"SELECT '{LEGACY_TERM}', enroll_num, start, times, opens, totals, last_time, last_open, "
+        "last_total, samples FROM enrollment_history"
+    )
+    op.drop_table('enrollment_history')
+    op.rename_table('enrollment_history_new', 'enrollment_history')
+
+
+def downgrade():
+    # Keeps only the legacy term's rows, the one term the old schema can hold
+    op.create_table('enrollment_history_old',
+    sa.Column('enroll_num', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('start', sa.Integer(), nullable=False),
+    sa.Column('times', sa.LargeBinary(), nullable=False),
+    sa.Column('opens', sa.LargeBinary(), nullable=False),
+    sa.Column('totals', sa.LargeBinary(), nullable=False),
+    sa.Column('last_time', sa.Integer(), nullable=False),
+    sa.Column('last_open', sa.Integer(), nullable=False),
+    sa.Column('last_total', sa.Integer(), nullable=False),
+    sa.Column('samples', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('enroll_num')
+    )
+    op.execute(
+        "INSERT INTO enrollment_history_old "
+        "SELECT enroll_num, start, times, opens, totals, last_time, last_open, last_total, samples "
+        f"FROM enrollment_history WHERE term = '{LEGACY_TERM}'"
+    )
+    op.drop_table('enrollment_history')
+    op.rename_table('enrollment_history_old', 'enrollment_history')
+
+    op.create_table('category_checkpoint_old',
+    sa.Column('ge', sa.String(length=5), nullable=False),
+    sa.Column('row_count', sa.Integer(), nullable=False),
+    sa.Column('digest', sa.String(length=40), nullable=True),
+    sa.Column('succeeded_at', sa.DateTime(), nullable=True),
+    sa.Column('attempted_at', sa.DateTime(), nullable=True),
+    sa.Column('failures', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.String(length=200), nullable=True),
+    sa.Column('rejected_count', sa.Integer(), nullable=True),
+    sa.Column('rejections', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('ge')
+    )
+    op.execute(
+        "INSERT INTO category_checkpoint_old "
+        "SELECT ge, row_count, digest, succeeded_at, attempted_at, failures, last_error, "
+        f"rejected_count, rejections FROM category_checkpoint WHERE term = '{LEGACY_TERM}'"
+    )
+    op.drop_table('category_checkpoint')
+    op.rename_table('category_checkpoint_old', 'category_checkpoint')
+
+    for table in ('course_model', 'snapshot'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(batch_op.f(f'ix_{table}_term'))
+    for table in ('course_model', 'snapshot', 'section_change'):
+        op.execute(f"DELETE FROM {table} WHERE term != '{LEGACY_TERM}'")
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_column('term')
+
+    op.drop_table('term')
@@ -0,0 +1,35 @@
+"""per-category scrape checkpoints
+
+Revision ID: 5b7d2e9c4a13
+Revises: 8e41a0c5d2f9
+Create Date: 2026-10-18 14:02:51.730264
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b7d2e9c4a13'
+down_revision = '8e41a0c5d2f9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('category_checkpoint',
+    sa.Column('ge', sa.String(length=5), nullable=False),
+    sa.Column('row_count', sa.Integer(), nullable=False),
+    sa.Column('digest', sa.String(length=40), nullable=True),
+    sa.Column('succeeded_at', sa.DateTime(), nullable=True),
+    sa.Column('attempted_at', sa.DateTime(), nullable=True),
+    sa.Column('failures', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.String(length=200), nullable=True),
+    sa.Column('rejected_count', sa.Integer(), nullable=True),
+    sa.Column('rejections', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('ge')
+    )
+
+
+def downgrade():
+    op.drop_table('category_checkpoint')
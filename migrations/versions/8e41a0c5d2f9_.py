@@ -0,0 +1,45 @@
+"""course position, unique requirements and catalog sync log
+
+Revision ID: 8e41a0c5d2f9
+Revises: 3c9d1f6a2b7e
+Create Date: 2026-10-18 11:40:07.208114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e41a0c5d2f9'
+down_revision = '3c9d1f6a2b7e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('catalog_sync',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('degrees', sa.Integer(), nullable=False),
+    sa.Column('degrees_added', sa.Integer(), nullable=False),
+    sa.Column('inserted', sa.Integer(), nullable=False),
+    sa.Column('updated', sa.Integer(), nullable=False),
+    sa.Column('deleted', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    # Earlier runs could leave duplicate requirement rows; keep the first of each
+    op.execute(
+        "DELETE FROM course WHERE id NOT IN "
+        "(SELECT MIN(id) FROM course GROUP BY degree_id, course_type, course_code)"
+    )
+    with op.batch_alter_table('course', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('position', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.create_unique_constraint('uq_course_degree_type_code', ['degree_id', 'course_type', 'course_code'])
+
+
+def downgrade():
+    with op.batch_alter_table('course', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_course_degree_type_code', type_='unique')
+        batch_op.drop_column('position')
+
+    op.drop_table('catalog_sync')
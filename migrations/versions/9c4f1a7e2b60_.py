@@ -0,0 +1,36 @@
+"""section change log
+
+Revision ID: 9c4f1a7e2b60
+Revises: 5b7d2e9c4a13
+Create Date: 2026-10-18 15:21:09.448102
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c4f1a7e2b60'
+down_revision = '5b7d2e9c4a13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('section_change',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('generation', sa.Integer(), nullable=False),
+    sa.Column('ge', sa.String(length=5), nullable=False),
+    sa.Column('enroll_num', sa.Integer(), nullable=False),
+    sa.Column('data', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('section_change', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_section_change_generation'), ['generation'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('section_change', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_section_change_generation'))
+
+    op.drop_table('section_change')
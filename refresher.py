@@ -0,0 +1,53 @@
+"""Runs the scrapers and owns every write to the database.
+
+    python refresher.py [--wait]
+    python refresher.py --freeze TERM | --unfreeze TERM
+    python refresher.py --profile-next
+
+Start it next to API processes running with APP_ROLE=api (for example
+`APP_ROLE=api gunicorn -w 4 app:app`), all pointed at the same database.
+A file lock (REFRESHER_LOCK, instance/refresher.lock by default) makes sure
+only one refresher runs; with --wait a second one blocks until it can take over.
+A frozen term (one that has ended) is still served but no longer scraped; the
+running refresher picks up a change within an hour. --profile-next asks the
+running refresher to profile its next refresh: the startup pass if it has not
+finished yet, otherwise a single scheduled GE category refresh, whichever
+category comes due first (see PROFILE_FLAG/PROFILE_DIR).
+"""
+import argparse
+import os
+import sys
+import time
+
+from app import PROFILE_FLAG, run_refresher, set_term_frozen
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--wait", action="store_true", help="wait for the lock instead of exiting")
+    parser.add_argument("--freeze", metavar="TERM", help="stop scraping a term, e.g. 2248, and exit")
+    parser.add_argument("--unfreeze", metavar="TERM", help="resume scraping a term and exit")
+    parser.add_argument("--profile-next", action="store_true", help="profile the next category refresh and exit")
+    args = parser.parse_args(argv)
+
+    if args.profile_next:
+        os.makedirs(os.path.dirname(PROFILE_FLAG), exist_ok=True)
+        open(PROFILE_FLAG, "a").close()
+        print(f"The next refresh will be profiled ({PROFILE_FLAG})")
+        return 0
+    if args.freeze or args.unfreeze:
+        terms = set_term_frozen(args.freeze or args.unfreeze, frozen=bool(args.freeze))
+        print(f"Terms: {terms['terms']} (active {terms['active']})")
+        return 0
+
+    if not run_refresher(wait=args.wait):
+        return 1
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -15,6 +15,7 @@ import { COLORS } from "../colors/Colors";
 import { Class } from "../types/Types";
 import * as Clipboard from "expo-clipboard";
 import {
+  fetchActiveTerm,
   fetchClassesBySubjectAndNumber,
   fetchClassesByTitle,
 } from "./GetClassSearchData";
@@ -37,7 +38,7 @@ export const ClassSearchResult = ({ route, navigation }) => {
   const fetchCourses = async () => {
     try {
       setLoading(true);
-      const quarter = "2248";
+      const quarter = await fetchActiveTerm();
       let data: Class[] = [];
 
       if (search.includes(" ")) {
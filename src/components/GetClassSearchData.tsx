@@ -1,4 +1,30 @@
-import { Class, SEARCH_API_URL } from "../types/Types";
+import { Class, SEARCH_API_URL, TERMS_URL } from "../types/Types";
+
+const FALLBACK_TERM = "2248";
+
+// Fetched once per app session; a failed lookup is retried on the next call
+let activeTerm: Promise<string> | null = null;
+
+const loadActiveTerm = async (): Promise<string> => {
+    try {
+      const response = await fetch(TERMS_URL);
+      const data = await response.json();
+      if (data?.active) {
+        return data.active;
+      }
+    } catch {
+      // fall through
+    }
+    activeTerm = null;
+    return FALLBACK_TERM;
+  };
+
+export const fetchActiveTerm = (): Promise<string> => {
+    if (!activeTerm) {
+      activeTerm = loadActiveTerm();
+    }
+    return activeTerm;
+  };
 
 export const fetchClassesBySubjectAndNumber = async (
     subject: string,
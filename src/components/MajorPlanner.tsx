@@ -14,7 +14,7 @@ import { Ionicons } from "@expo/vector-icons";
 import { COLORS } from "@/colors/Colors";
 import { customCategoryOrder, MAJOR_API_URL } from "@/types/Types";
 import { CourseList } from "./CourseList";
-import { fetchClassesBySubjectAndNumber } from "./GetClassSearchData";
+import { fetchActiveTerm, fetchClassesBySubjectAndNumber } from "./GetClassSearchData";
 import Icon from "react-native-vector-icons/Ionicons";
 
 const { width: screenWidth } = Dimensions.get("window");
@@ -76,7 +76,7 @@ export const MajorPlanner = ({ route, navigation }) => {
         const result = await fetchClassesBySubjectAndNumber(
           subject,
           number,
-          "2248"
+          await fetchActiveTerm()
         );
         setCourseList((prev) => ({ ...prev, [course]: result }));
       } catch (error) {
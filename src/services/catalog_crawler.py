@@ -0,0 +1,125 @@
+import asyncio
+import random
+import time
+from urllib.parse import urlsplit
+import httpx
+
+USER_AGENT = "UCSC-Course/1.0"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    # Allows `rate` requests per second on average, with bursts of up to `capacity`
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class CatalogCrawler:
+    def __init__(self, max_per_host=4, rate=4.0, burst=4, timeout=15.0, retries=3, backoff=0.5):
+        self.max_per_host = max_per_host
+        self.rate = rate
+        self.burst = burst
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.host_limits = {}
+        self.buckets = {}
+
+    def _host(self, url):
+        host = urlsplit(url).netloc
+        if host not in self.host_limits:
+            self.host_limits[host] = asyncio.Semaphore(self.max_per_host)
+            self.buckets[host] = TokenBucket(self.rate, self.burst)
+        return self.host_limits[host], self.buckets[host]
+
+    def client(self):
+        return httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=self.max_per_host * 2, max_keepalive_connections=self.max_per_host),
+            headers={"User-Agent": USER_AGENT},
+            follow_redirects=True,
+        )
+
+    def _delay(self, attempt, response=None):
+        if response is not None and response.headers.get("Retry-After", "").isdigit():
+            return float(response.headers["Retry-After"])
+        return self.backoff * (2 ** attempt) * (1 + random.random())
+
+    async def fetch(self, client, url, headers=None):
+        limit, bucket = self._host(url)
+        for attempt in range(self.retries + 1):
+            response = None
+            try:
+                async with limit:
+                    await bucket.acquire()
+                    response = await client.get(url, headers=headers)
+                if response.status_code == 304:
+                    return response
+                if response.status_code not in RETRY_STATUSES:
+                    response.raise_for_status()
+                    return response
+                error = f"HTTP {response.status_code}"
+            except httpx.TransportError as e:
+                error = repr(e)
+            if attempt == self.retries:
+                raise RuntimeError(f"{url} failed after {self.retries + 1} attempts: {error}")
+            delay = self._delay(attempt, response)
+            print(f"Retrying {url} in {delay:.1f}s ({error})")
+            await asyncio.sleep(delay)
+
+    async def fetch_cached(self, client, url, cache):
+        # Returns (content, hash, changed), revalidating the cached copy if there is one
+        if cache.offline:
+            content, digest = cache.cached(url)
+            return content, digest, False
+        response = await self.fetch(client, url, headers=cache.conditional_headers(url))
+        if response.status_code == 304:
+            return cache.not_modified(url)
+        return cache.store(url, response.content, response.headers)
+
+    async def crawl(self, links, parse, cache=None, cache_key=None):
+        # links: [(url, name)]; parse(content) runs in a worker thread so it
+        # does not stall the event loop. Returns {name: parse(content)}.
+        # With a cache, pages whose bytes have not changed reuse the value
+        # stored under cache_key instead of being parsed again.
+        results = {}
+        loop = asyncio.get_running_loop()
+
+        async def crawl_one(client, url, name):
+            try:
+                if cache is None:
+                    response = await self.fetch(client, url)
+                    results[name] = await loop.run_in_executor(None, parse, response.content)
+                else:
+                    content, digest, changed = await self.fetch_cached(client, url, cache)
+                    value = None if changed else cache.derived(url, digest, cache_key)
+                    if value is None:
+                        value = await loop.run_in_executor(None, parse, content)
+                        cache.store_derived(url, digest, cache_key, value)
+                    results[name] = value
+                print(f"Scraped courses from: {name}")
+            except Exception as exc:
+                print(f"{name} generated an exception: {exc}")
+
+        async with self.client() as client:
+            await asyncio.gather(*(crawl_one(client, url, name) for url, name in links))
+        return results
+
+
+def crawl(links, parse, cache=None, cache_key=None, **options):
+    return asyncio.run(CatalogCrawler(**options).crawl(links, parse, cache, cache_key))
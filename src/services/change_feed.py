@@ -0,0 +1,42 @@
+import threading
+
+
+def compact_changes(changes):
+    # changes: [(ge, enroll_num, row or None)] oldest first. Only the latest
+    # change per section matters to a client catching up.
+    latest = {}
+    for ge, enroll_num, row in changes:
+        latest[(ge, enroll_num)] = row
+    upserts = [row for row in latest.values() if row is not None]
+    deletes = [{"ge": ge, "enroll_num": enroll_num} for (ge, enroll_num), row in latest.items() if row is None]
+    return upserts, deletes
+
+
+def sse_event(data, event=None, event_id=None):
+    # data is already-serialized JSON bytes
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event:
+        lines.append(f"event: {event}")
+    message = "\n".join(lines + [f"data: {data.decode('utf-8')}"]) + "\n\n"
+    return message.encode("utf-8")
+
+
+class GenerationNotifier:
+    # Lets stream handlers sleep until a newer snapshot generation is published
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.generation = 0
+
+    def publish(self, generation):
+        with self.condition:
+            if generation > self.generation:
+                self.generation = generation
+                self.condition.notify_all()
+
+    def wait(self, after, timeout):
+        # Returns the current generation once it is past `after`, or after timeout
+        with self.condition:
+            self.condition.wait_for(lambda: self.generation > after, timeout)
+            return self.generation
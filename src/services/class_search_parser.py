@@ -0,0 +1,133 @@
+import re
+from urllib.parse import urljoin
+from lxml import html as lxml_html
+from src.services.course import Course
+
+CLASS_SEARCH_URL = "https://pisa.ucsc.edu/class_search/index.php"
+
+
+def _class_xpath(tag, *classes):
+    checks = " and ".join(
+        f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')" for name in classes
+    )
+    return f".//{tag}[{checks}]"
+
+
+ROW_XPATH = _class_xpath("div", "panel", "panel-default", "row")
+COL3_XPATH = _class_xpath("div", "col-xs-6", "col-sm-3")
+COL3_HIDE_XPATH = _class_xpath("div", "col-xs-6", "col-sm-3", "hide-print")
+COL6_XPATH = _class_xpath("div", "col-xs-6", "col-sm-6")
+NEXT_XPATH = "//a[contains(@onclick, 'next')]"
+
+
+def _text(element):
+    return " ".join(element.text_content().split())
+
+
+def _strip_label(text, label):
+    return text.replace(label, "").strip()
+
+
+# A raw row holds the visible text of one result panel, as produced by either
+# extract_rows (lxml) or EXTRACT_ROWS_SCRIPT (in the browser):
+#   {"link": href, "title": link text, "cols3": [...], "cols3_hide": [...], "cols6": [...]}
+def row_to_course(row, ge=None):
+    link_text = re.split(r"\s{2,}", row["title"].strip(), maxsplit=1)
+    class_code = link_text[0]
+    class_name = link_text[1] if len(link_text) > 1 else ""
+
+    cols3 = row["cols3"]
+    enroll_num = _strip_label(cols3[0], "Class Number:")
+
+    teacher_name = _strip_label(cols3[1], "Instructor:")
+    names = teacher_name.split(",")
+    teacher_name = names[1].strip() + " " + names[0].strip() if len(names) > 1 else teacher_name
+
+    enrollment = re.search(r"(\d+)\s+of\s+(\d+)", cols3[2])
+    if enrollment:
+        enrolled, total = int(enrollment.group(1)), int(enrollment.group(2))
+    else:
+        enrolled, total = map(int, cols3[2].split(" ")[0:3:2])
+    class_count = f"{total - enrolled}/{total}"
+
+    class_type = _strip_label(row["cols3_hide"][2], "Instruction Mode:")
+    location = _strip_label(row["cols6"][0], "Location:")
+    schedule = _strip_label(row["cols6"][1], "Day and Time:")
+
+    return Course(
+        code=class_code,
+        name=class_name,
+        instructor=teacher_name,
+        link=row["link"],
+        class_count=class_count,
+        enroll_num=enroll_num,
+        class_type=class_type,
+        schedule=schedule,
+        location=location,
+        ge=ge,
+    )
+
+
+def parse_document(content):
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return lxml_html.document_fromstring(content, parser=lxml_html.HTMLParser(encoding="utf-8"))
+
+
+def extract_rows(document, base_url=CLASS_SEARCH_URL):
+    rows = []
+    for panel in document.xpath(ROW_XPATH):
+        links = panel.xpath(".//a")
+        if not links:
+            continue
+        rows.append({
+            "link": urljoin(base_url, links[0].get("href", "")),
+            "title": links[0].text_content().replace("\xa0", " "),
+            "cols3": [_text(div) for div in panel.xpath(COL3_XPATH)],
+            "cols3_hide": [_text(div) for div in panel.xpath(COL3_HIDE_XPATH)],
+            "cols6": [_text(div) for div in panel.xpath(COL6_XPATH)],
+        })
+    return rows
+
+
+def rows_to_courses(rows, ge=None):
+    courses = []
+    for row in rows:
+        try:
+            courses.append(row_to_course(row, ge))
+        except (IndexError, ValueError) as e:
+            print(f"Skipping malformed class row {row.get('link')}: {e}")
+    return courses
+
+
+def parse_results_page(document, ge=None, base_url=CLASS_SEARCH_URL):
+    return rows_to_courses(extract_rows(document, base_url), ge)
+
+
+def has_next_page(document):
+    return bool(document.xpath(NEXT_XPATH))
+
+
+def search_form(document):
+    for form in document.forms:
+        if form.xpath(".//*[@name='binds[:ge]']"):
+            return form
+    return document.forms[0] if document.forms else None
+
+
+def form_fields(form):
+    return dict(form.form_values())
+
+
+def term_options(document):
+    # {value: name} of every term in the dropdown
+    return {option.get("value"): _text(option) for option in document.xpath("//select[@id='term_dropdown']/option")}
+
+
+def selected_term(document):
+    options = document.xpath("//select[@id='term_dropdown']/option[@selected]")
+    if not options:
+        options = document.xpath("//select[@id='term_dropdown']/option")
+    if not options:
+        return None, None
+    return options[0].get("value"), _text(options[0])
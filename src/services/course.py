@@ -1,5 +1,9 @@
 class Course:
-    def __init__(self,code, name, instructor, link, class_count, enroll_num,class_type,schedule, location):
+    # Scrapes hold thousands of these at once, so skip the per-instance __dict__
+    __slots__ = ("ge", "code", "name", "instructor", "link", "class_count", "enroll_num", "class_type", "schedule", "location")
+
+    def __init__(self,code, name, instructor, link, class_count, enroll_num,class_type,schedule, location, ge=None):
+        self.ge=ge
         self.code=code
         self.name = name
         self.instructor = instructor
@@ -13,4 +17,4 @@ class Course:
     
 
     def __repr__(self):
-        return f"Course(code={self.code}, name={self.name}, instructors={self.instructor}, link={self.link}, class_count={self.class_count}, enroll_num={self.enroll_num}, class_type={self.class_type},schedule={self.schedule}, location={self.location})"
\ No newline at end of file
+        return f"Course(ge={self.ge}, code={self.code}, name={self.name}, instructors={self.instructor}, link={self.link}, class_count={self.class_count}, enroll_num={self.enroll_num}, class_type={self.class_type},schedule={self.schedule}, location={self.location})"
\ No newline at end of file
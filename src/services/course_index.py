@@ -0,0 +1,153 @@
+import base64
+import bisect
+import re
+from collections import defaultdict
+from src.services.course_sync import section_key
+from src.services.schedule import parse_days, parse_schedule
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+SECTION_SUFFIX_PATTERN = re.compile(r"\s*-\s*\w+\s*$")
+COURSE_CODE_PATTERN = re.compile(r"^([A-Z]+)\s*(\d+[A-Z]*)$")
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall((text or "").lower())
+
+
+def open_seats(class_count):
+    # class_count is stored as "open/total"
+    try:
+        return int(str(class_count).split("/")[0])
+    except ValueError:
+        return 0
+
+
+def normalize_course_code(code):
+    # "CSE 20 - 01" (a section) and "cse  20" (a catalog code) both become "CSE 20"
+    code = " ".join((code or "").upper().split())
+    code = SECTION_SUFFIX_PATTERN.sub("", code)
+    match = COURSE_CODE_PATTERN.match(code)
+    return f"{match.group(1)} {match.group(2)}" if match else code
+
+
+def sections_by_course(rows):
+    # Normalized course code -> sections; a section listed under several GE
+    # categories appears once
+    index = defaultdict(list)
+    seen = set()
+    for row in rows:
+        if row["enroll_num"] in seen:
+            continue
+        seen.add(row["enroll_num"])
+        index[normalize_course_code(row["code"])].append(row)
+    return dict(index)
+
+
+class CourseIndex:
+    # Inverted indexes over one snapshot's rows. Every posting list holds row
+    # positions in snapshot order, so results keep the order of /api/courses.
+    def __init__(self, rows):
+        self.rows = rows
+        self.positions = {}
+        self.by_ge = defaultdict(list)
+        self.by_class_type = defaultdict(list)
+        self.instructor_tokens = defaultdict(list)
+        self.location_tokens = defaultdict(list)
+        self.times = []
+        seats = []
+
+        for position, row in enumerate(rows):
+            self.positions[section_key(row)] = position
+            self.by_ge[row["ge"]].append(position)
+            self.by_class_type[(row["class_type"] or "").lower()].append(position)
+            for token in set(tokenize(row["instructor"])):
+                self.instructor_tokens[token].append(position)
+            for token in set(tokenize(row["location"])):
+                self.location_tokens[token].append(position)
+            self.times.append(parse_schedule(row["schedule"]))
+            seats.append((open_seats(row["class_count"]), position))
+
+        seats.sort()
+        self.seat_counts = [count for count, _ in seats]
+        self.seat_positions = [position for _, position in seats]
+
+    def with_open_seats(self, minimum):
+        start = bisect.bisect_left(self.seat_counts, minimum)
+        return self.seat_positions[start:]
+
+    def _token_matches(self, index, text):
+        tokens = tokenize(text)
+        if not tokens:
+            return []
+        candidates = None
+        for token in tokens:
+            postings = set(index.get(token, ()))
+            candidates = postings if candidates is None else candidates & postings
+            if not candidates:
+                return []
+        return candidates
+
+    def search(self, ge=None, min_open=None, class_type=None, instructor=None,
+               location=None, days=None, start_after=None, end_before=None):
+        candidate_sets = []
+        if ge is not None:
+            candidate_sets.append(self.by_ge.get(ge, ()))
+        if class_type is not None:
+            candidate_sets.append(self.by_class_type.get(class_type.lower(), ()))
+        if instructor is not None:
+            candidate_sets.append(self._token_matches(self.instructor_tokens, instructor))
+        if location is not None:
+            candidate_sets.append(self._token_matches(self.location_tokens, location))
+        if min_open is not None:
+            candidate_sets.append(self.with_open_seats(min_open))
+
+        if candidate_sets:
+            # Intersect starting from the most selective posting list
+            candidate_sets.sort(key=len)
+            matches = set(candidate_sets[0])
+            for postings in candidate_sets[1:]:
+                if not matches:
+                    break
+                matches.intersection_update(postings)
+            positions = sorted(matches)
+        else:
+            positions = range(len(self.rows))
+
+        if days is None and start_after is None and end_before is None:
+            return positions
+
+        wanted_days = set(parse_days(days)) if days is not None else None
+        selected = []
+        for position in positions:
+            meeting = self.times[position]
+            if meeting is None:
+                continue
+            meeting_days, start, end = meeting
+            if wanted_days is not None and not set(meeting_days) <= wanted_days:
+                continue
+            if start_after is not None and start < start_after:
+                continue
+            if end_before is not None and end > end_before:
+                continue
+            selected.append(position)
+        return selected
+
+
+def encode_cursor(generation, position, row):
+    enroll_num, ge = section_key(row)
+    raw = f"{generation}:{position}:{enroll_num}:{ge}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, generation, index):
+    # Returns the position to resume after. Cursors from an older generation
+    # resume after the same section if it still exists.
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        cursor_generation, position, enroll_num, ge = raw.split(":", 3)
+        cursor_generation, position, enroll_num = int(cursor_generation), int(position), int(enroll_num)
+    except ValueError:
+        raise ValueError("invalid cursor")
+    if cursor_generation == generation:
+        return position
+    return index.positions.get((enroll_num, ge), position)
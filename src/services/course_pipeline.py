@@ -0,0 +1,80 @@
+import concurrent.futures
+import queue
+import time
+from src.services.metrics import SCRAPE_PAGES, SCRAPE_ROWS, SCRAPE_SECONDS
+
+PAGE_QUEUE_SIZE = 32  # parsed pages waiting for the writer before scrapers block
+SCRAPE_RETRIES = 2
+RETRY_BACKOFF = 5  # seconds, doubled after every failed attempt
+
+_DONE = object()
+_RETRY = object()  # pages already sent for the category belong to a failed attempt
+
+
+class CoursePipeline:
+    # Scraper threads push each parsed results page onto a bounded queue and a
+    # single writer (the thread calling run) drains it. A category is written
+    # as soon as its last page arrives, so fast categories do not wait for the
+    # slowest one, and only categories still in flight are held in memory.
+    def __init__(self, write, max_pending=PAGE_QUEUE_SIZE, retries=SCRAPE_RETRIES, backoff=RETRY_BACKOFF, name="scrape"):
+        self.write = write  # write(ge, courses) -> result, called on the writer thread
+        self.name = name  # prefix of the scraper thread names
+        self.pages = queue.Queue(maxsize=max_pending)
+        self.retries = retries
+        self.backoff = backoff
+
+    def _scrape(self, scrape_pages, ge):
+        def on_page(courses):
+            SCRAPE_PAGES.labels(ge).inc()
+            SCRAPE_ROWS.labels(ge).inc(len(courses))
+            self.pages.put((ge, courses))
+
+        for attempt in range(self.retries + 1):
+            started = time.perf_counter()
+            try:
+                scrape_pages(ge, on_page)
+                SCRAPE_SECONDS.labels(ge, "ok").observe(time.perf_counter() - started)
+                self.pages.put((ge, _DONE))
+                return
+            except Exception as e:
+                SCRAPE_SECONDS.labels(ge, "error").observe(time.perf_counter() - started)
+                if attempt == self.retries:
+                    self.pages.put((ge, e))
+                    return
+                delay = self.backoff * (2 ** attempt)
+                print(f"Scraping {ge} failed on attempt {attempt + 1} ({e}); retrying in {delay}s")
+                self.pages.put((ge, _RETRY))
+                time.sleep(delay)
+
+    def run(self, scrape_pages, ge_choices, max_workers):
+        results = {}
+        errors = {}
+        pending = {ge: [] for ge in ge_choices}
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=self.name) as executor:
+            for ge in ge_choices:
+                executor.submit(self._scrape, scrape_pages, ge)
+
+            while pending:
+                ge, item = self.pages.get()
+                if isinstance(item, list):
+                    pending[ge].extend(item)
+                    continue
+                if item is _RETRY:
+                    pending[ge] = []
+                    continue
+
+                courses = pending.pop(ge)
+                if isinstance(item, Exception):
+                    errors[ge] = item
+                    print(f"An error occurred while scraping {ge}: {item}")
+                else:
+                    # Empty results are written too: the writer decides whether
+                    # a category really has no sections left
+                    try:
+                        results[ge] = self.write(ge, courses)
+                    except Exception as e:
+                        errors[ge] = e
+                        print(f"Error storing {ge} courses: {e}")
+
+        return results, errors
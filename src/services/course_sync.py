@@ -0,0 +1,87 @@
+import hashlib
+import json
+
+# A category that shrinks below this fraction of its stored sections in one
+# scrape is held back as a likely partial scrape
+MIN_RESULT_RATIO = 0.5
+MIN_CHECKED_ROWS = 20  # smaller categories are not checked, unless they come back empty
+CONFIRMATIONS = 3  # the same smaller count this many times in a row is accepted
+
+SECTION_FIELDS = (
+    "ge",
+    "code",
+    "name",
+    "instructor",
+    "link",
+    "class_count",
+    "enroll_num",
+    "class_type",
+    "schedule",
+    "location",
+)
+
+
+def course_to_row(course):
+    row = {field: getattr(course, field) for field in SECTION_FIELDS}
+    row["enroll_num"] = int(row["enroll_num"])
+    return row
+
+
+def section_key(row):
+    return (int(row["enroll_num"]), row["ge"])
+
+
+def diff_sections(existing, incoming):
+    # existing maps section_key -> (id, row); incoming is a list of rows.
+    # Returns rows to insert, (id, row) pairs to update and ids to delete.
+    seen = {}
+    for row in incoming:
+        seen[section_key(row)] = row
+
+    inserts = []
+    updates = []
+    for key, row in seen.items():
+        current = existing.get(key)
+        if current is None:
+            inserts.append(row)
+        elif any(current[1][field] != row[field] for field in SECTION_FIELDS):
+            updates.append((current[0], row))
+
+    deletes = [row_id for key, (row_id, _) in existing.items() if key not in seen]
+    return inserts, updates, deletes
+
+
+def rows_digest(rows):
+    # Order-independent fingerprint of a category's scraped sections
+    keyed = sorted([row[field] for field in SECTION_FIELDS] for row in rows)
+    return hashlib.sha1(json.dumps(keyed).encode("utf-8")).hexdigest()
+
+
+def plausible_result(previous, count, rejected_count=None, rejections=0):
+    # An empty result is the usual sign of a failed scrape, so emptying a
+    # category always takes the confirmations
+    if count == 0:
+        if previous == 0:
+            return True
+    elif previous < MIN_CHECKED_ROWS or count >= previous * MIN_RESULT_RATIO:
+        return True
+    return rejected_count == count and rejections + 1 >= CONFIRMATIONS
+
+
+class SuspiciousResult(Exception):
+    pass
+
+
+class SyncResult:
+    def __init__(self, inserted=0, updated=0, deleted=0, unchanged=0):
+        self.inserted = inserted
+        self.updated = updated
+        self.deleted = deleted
+        self.unchanged = unchanged
+
+    @property
+    def changed(self):
+        return self.inserted + self.updated + self.deleted
+
+    def __repr__(self):
+        return f"SyncResult(inserted={self.inserted}, updated={self.updated}, deleted={self.deleted}, unchanged={self.unchanged})"
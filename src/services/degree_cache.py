@@ -0,0 +1,40 @@
+from src.services.major_courses import sort_courses_by_type
+from src.services.response_cache import CachedResponse, serialize
+
+
+def degree_aliases(name):
+    # The app requests degrees with "/" replaced by "-" so the name fits in one path segment
+    return {name, name.replace("/", "-")}
+
+
+class DegreeReadModel:
+    # Pre-serialized, correctly ordered requirement documents for every degree,
+    # rebuilt whenever the degree tables change
+    def __init__(self, degrees, version=0):
+        # degrees: [(degree_name, [(course_type, course_code), ...])] in display order
+        self.version = version
+        self.requirements = {}
+        self.documents = {}
+        self.aliases = {}
+
+        for name, courses in degrees:
+            by_type = {}
+            for course_type, course_code in courses:
+                by_type.setdefault(course_type, []).append(course_code)
+            by_type = sort_courses_by_type(by_type)
+            self.requirements[name] = by_type
+            self.documents[name] = CachedResponse(serialize(by_type))
+            for alias in degree_aliases(name):
+                self.aliases.setdefault(alias, name)
+
+        self.degree_list = CachedResponse(serialize([name for name, _ in degrees]))
+
+    def resolve(self, name):
+        return self.aliases.get(name)
+
+    def document(self, name):
+        name = self.resolve(name)
+        return self.documents[name] if name is not None else None
+
+    def __len__(self):
+        return len(self.documents)
@@ -0,0 +1,35 @@
+def requirement_rows(all_courses, degree_ids):
+    # {degree: {course_type: [codes]}} -> {(degree_id, course_type, course_code): position}
+    desired = {}
+    for degree_name, course_data in all_courses.items():
+        degree_id = degree_ids[degree_name]
+        position = 0
+        for course_type, courses in course_data.items():
+            for course_code in courses:
+                key = (degree_id, course_type, course_code)
+                if key not in desired:
+                    desired[key] = position
+                    position += 1
+    return desired
+
+
+def diff_requirements(existing, desired):
+    # existing maps key -> (id, position); desired maps key -> position.
+    # Returns rows to insert, (id, position) pairs to move and ids to delete.
+    inserts = []
+    moves = []
+    for key, position in desired.items():
+        current = existing.get(key)
+        if current is None:
+            degree_id, course_type, course_code = key
+            inserts.append({
+                "degree_id": degree_id,
+                "course_type": course_type,
+                "course_code": course_code,
+                "position": position,
+            })
+        elif current[1] != position:
+            moves.append((current[0], position))
+
+    deletes = [row_id for key, (row_id, _) in existing.items() if key not in desired]
+    return inserts, moves, deletes
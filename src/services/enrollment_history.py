@@ -0,0 +1,162 @@
+import re
+
+DAY = 86400
+# (age in seconds, bucket in seconds): samples older than the age keep only
+# the last value of each bucket. Newer samples are kept as scraped.
+HISTORY_RETENTION = ((7 * DAY, 3600), (30 * DAY, DAY))
+FORECAST_WINDOW = 3 * DAY  # recent history used to extrapolate seats left
+
+
+# Each history column is a byte string of LEB128 varints: the first value is
+# absolute, every later one the difference from the previous sample. Open and
+# total seats can go down, so their deltas are zigzag encoded first. Samples
+# are only added when the seat counts change, so a quiet section costs nothing.
+def zigzag(n):
+    return n * 2 if n >= 0 else -n * 2 - 1
+
+
+def unzigzag(n):
+    return n // 2 if n % 2 == 0 else -(n + 1) // 2
+
+
+def encode_varints(values):
+    out = bytearray()
+    for value in values:
+        while value >= 0x80:
+            out.append((value & 0x7F) | 0x80)
+            value >>= 7
+        out.append(value)
+    return bytes(out)
+
+
+def decode_varints(data):
+    values = []
+    value = shift = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            values.append(value)
+            value = shift = 0
+    return values
+
+
+def parse_class_count(text):
+    # "12/40" (open/total) -> (12, 40)
+    match = re.match(r"\s*(-?\d+)\s*/\s*(\d+)", str(text or ""))
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+
+def new_history(enroll_num, t, open_seats, total):
+    return {
+        "enroll_num": enroll_num,
+        "start": t,
+        "times": encode_varints([0]),
+        "opens": encode_varints([zigzag(open_seats)]),
+        "totals": encode_varints([zigzag(total)]),
+        "last_time": t,
+        "last_open": open_seats,
+        "last_total": total,
+        "samples": 1,
+    }
+
+
+def append_sample(history, t, open_seats, total):
+    # history is any object with the new_history fields as attributes.
+    # Returns False (and changes nothing) when the counts are the same.
+    if open_seats == history.last_open and total == history.last_total:
+        return False
+    history.times += encode_varints([max(t - history.last_time, 0)])
+    history.opens += encode_varints([zigzag(open_seats - history.last_open)])
+    history.totals += encode_varints([zigzag(total - history.last_total)])
+    history.last_time = max(t, history.last_time)
+    history.last_open = open_seats
+    history.last_total = total
+    history.samples += 1
+    return True
+
+
+def decode_samples(history):
+    # -> [(time, open, total)], oldest first
+    samples = []
+    t, open_seats, total = history.start, 0, 0
+    columns = zip(decode_varints(history.times), decode_varints(history.opens), decode_varints(history.totals))
+    for dt, d_open, d_total in columns:
+        t += dt
+        open_seats += unzigzag(d_open)
+        total += unzigzag(d_total)
+        samples.append((t, open_seats, total))
+    return samples
+
+
+def encode_samples(enroll_num, samples):
+    first_time, first_open, first_total = samples[0]
+    history = new_history(enroll_num, first_time, first_open, first_total)
+    times, opens, totals = [0], [zigzag(first_open)], [zigzag(first_total)]
+    for (t0, open0, total0), (t1, open1, total1) in zip(samples, samples[1:]):
+        times.append(t1 - t0)
+        opens.append(zigzag(open1 - open0))
+        totals.append(zigzag(total1 - total0))
+    last_time, last_open, last_total = samples[-1]
+    history.update(
+        times=encode_varints(times),
+        opens=encode_varints(opens),
+        totals=encode_varints(totals),
+        last_time=last_time,
+        last_open=last_open,
+        last_total=last_total,
+        samples=len(samples),
+    )
+    return history
+
+
+def downsample(samples, now, retention=HISTORY_RETENTION):
+    # Keeps the last sample of each bucket for samples past each age limit
+    kept = []
+    for sample in samples:
+        age = now - sample[0]
+        bucket_size = None
+        for max_age, size in retention:
+            if age > max_age:
+                bucket_size = size
+        if bucket_size is None:
+            kept.append((None, sample))
+            continue
+        bucket = (bucket_size, sample[0] // bucket_size)
+        if kept and kept[-1][0] == bucket:
+            kept[-1] = (bucket, sample)
+        else:
+            kept.append((bucket, sample))
+    compacted = [sample for _, sample in kept]
+    # Runs of equal counts left behind by dropping samples in between
+    return [s for i, s in enumerate(compacted) if i == 0 or s[1:] != compacted[i - 1][1:]]
+
+
+def fill_curve(samples):
+    # -> [(time, fraction of seats taken)]
+    return [(t, round((total - open_seats) / total, 4) if total else 1.0) for t, open_seats, total in samples]
+
+
+def estimate_open(samples, at, now, window=FORECAST_WINDOW):
+    # Least-squares line through the open-seat counts of the last `window`
+    # seconds, extrapolated to `at`. Returns (estimated open seats, change per
+    # day, time the section is expected to fill or None).
+    _, open_now, total = samples[-1]
+    points = [(t, open_seats) for t, open_seats, _ in samples if t >= now - window]
+    points.append((now, open_now))
+    if len(points) < 2 or at <= now:
+        return open_now, 0.0, None
+
+    mean_t = sum(t for t, _ in points) / len(points)
+    mean_open = sum(o for _, o in points) / len(points)
+    variance = sum((t - mean_t) ** 2 for t, _ in points)
+    if variance == 0:
+        return open_now, 0.0, None
+    slope = sum((t - mean_t) * (o - mean_open) for t, o in points) / variance
+    if slope >= 0:
+        return open_now, slope * DAY, None
+
+    estimate = max(0, min(total, round(open_now + slope * (at - now))))
+    full_at = now + open_now / -slope if open_now > 0 else now
+    return estimate, slope * DAY, int(full_at)
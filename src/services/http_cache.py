@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from src.services.metrics import CACHE_LOOKUPS
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "instance", "http_cache")
+CACHE_DIR = os.environ.get("CATALOG_CACHE_DIR", DEFAULT_CACHE_DIR)
+# Serve catalog pages from the cache only, without touching the network
+OFFLINE = os.environ.get("CATALOG_OFFLINE", "").lower() in ("1", "true", "yes")
+
+
+class CacheMiss(Exception):
+    pass
+
+
+def content_hash(content):
+    return hashlib.sha256(content).hexdigest()
+
+
+def _write_atomic(path, data):
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class HttpCache:
+    # Response bodies keyed by URL, with their validators (ETag/Last-Modified)
+    # and content hash, plus values derived from a body (such as parsed course
+    # lists) that stay valid for as long as the body's hash does not change.
+    def __init__(self, directory=CACHE_DIR, offline=OFFLINE):
+        self.directory = os.path.abspath(directory)
+        self.offline = offline
+        self.hits = 0
+        self.revalidated = 0
+        self.fetched = 0
+
+    def _path(self, url, suffix):
+        return os.path.join(self.directory, hashlib.sha256(url.encode("utf-8")).hexdigest() + suffix)
+
+    def lookup(self, url):
+        try:
+            with open(self._path(url, ".json"), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def body(self, url):
+        with open(self._path(url, ".body"), "rb") as f:
+            return f.read()
+
+    def conditional_headers(self, url):
+        entry = self.lookup(url)
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def cached(self, url):
+        # Returns (content, hash) for a cached URL, raising CacheMiss if there is none
+        entry = self.lookup(url)
+        if entry is None:
+            raise CacheMiss(url)
+        try:
+            return self.body(url), entry["sha256"]
+        except OSError:
+            raise CacheMiss(url)
+
+    def not_modified(self, url):
+        self.revalidated += 1
+        CACHE_LOOKUPS.labels("catalog", "not_modified").inc()
+        content, digest = self.cached(url)
+        return content, digest, False
+
+    def store(self, url, content, headers):
+        # Returns (content, hash, changed) where changed is False when the
+        # server sent a full response with the same bytes as before
+        os.makedirs(self.directory, exist_ok=True)
+        self.fetched += 1
+        CACHE_LOOKUPS.labels("catalog", "fetched").inc()
+        previous = self.lookup(url)
+        digest = content_hash(content)
+        changed = previous is None or previous.get("sha256") != digest
+        entry = {
+            "url": url,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "sha256": digest,
+            "fetched_at": time.time(),
+            "derived": previous.get("derived", {}) if previous and not changed else {},
+        }
+        if changed:
+            _write_atomic(self._path(url, ".body"), content)
+        _write_atomic(self._path(url, ".json"), json.dumps(entry).encode("utf-8"))
+        return content, digest, changed
+
+    def derived(self, url, digest, name):
+        entry = self.lookup(url)
+        if entry and entry.get("sha256") == digest and name in entry.get("derived", {}):
+            self.hits += 1
+            CACHE_LOOKUPS.labels("catalog", "parse_skipped").inc()
+            return entry["derived"][name]
+        return None
+
+    def store_derived(self, url, digest, name, value):
+        entry = self.lookup(url)
+        if not entry or entry.get("sha256") != digest:
+            return
+        entry.setdefault("derived", {})[name] = value
+        _write_atomic(self._path(url, ".json"), json.dumps(entry).encode("utf-8"))
+
+    def stats(self):
+        return {"fetched": self.fetched, "not_modified": self.revalidated, "parse_skipped": self.hits}
+
+
+catalog_cache = HttpCache()
@@ -0,0 +1,46 @@
+import fcntl
+import os
+
+
+class LeaderLock:
+    # An exclusive lock on a file. Only one process on the host holds it, and
+    # the OS releases it if that process dies, so a restarted refresher can
+    # take over without any cleanup.
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+
+    @property
+    def held(self):
+        return self.file is not None
+
+    def acquire(self, blocking=False):
+        if self.file is not None:
+            return True
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        lock_file = open(self.path, "a+")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            lock_file.close()
+            return False
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(f"{os.getpid()}\n")
+        lock_file.flush()
+        self.file = lock_file
+        return True
+
+    def release(self):
+        if self.file is None:
+            return
+        fcntl.flock(self.file, fcntl.LOCK_UN)
+        self.file.close()
+        self.file = None
+
+    def holder(self):
+        try:
+            with open(self.path) as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
@@ -1,7 +1,7 @@
 from src.services.major_links import main as get_links_from_major_links
-import requests
-from bs4 import BeautifulSoup
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from src.services.catalog_crawler import crawl
+from src.services.http_cache import catalog_cache
+from lxml import html as lxml_html
 
 COURSE_TYPE_ORDER = [
     "Major Qualification",
@@ -11,32 +11,53 @@ COURSE_TYPE_ORDER = [
     "Disciplinary Communications (DC) Requirements"
 ]
 
-def scrape_courses_from_page(page_url):
-    response = requests.get(page_url)
-    soup = BeautifulSoup(response.content, 'html.parser')
+# Bump when parse_courses_from_page changes output, so cached results are re-parsed
+PARSER_VERSION = 2
 
-    courses_by_type = {}
-
-    course_types = soup.find_all('h4', class_='sc-RequiredCoursesHeading2')
-
-    for course_type in course_types:
-        course_type_text = course_type.get_text(strip=True)
+REQUIREMENT_HEADING_CLASS = 'sc-RequiredCoursesHeading2'
+COURSE_LINK_CLASS = 'sc-courselink'
+UTF8_PARSER = lxml_html.HTMLParser(encoding='utf-8')
 
-        next_element = course_type.find_next_sibling()
+def parse_html(content):
+    parser = None
+    if isinstance(content, bytes):
+        try:
+            content.decode('utf-8')
+            parser = UTF8_PARSER
+        except UnicodeDecodeError:
+            pass  # let libxml2 pick the encoding from the page
+    return lxml_html.document_fromstring(content, parser=parser)
 
-        course_list = []
+def has_class(element, name):
+    return name in (element.get('class') or '').split()
 
-        while next_element and next_element.name != 'h4':
-            course_links = next_element.find_all('a', class_='sc-courselink')
+def stripped_text(element):
+    # Same as BeautifulSoup's get_text(strip=True)
+    return ''.join(text.strip() for text in element.itertext())
 
-            for link in course_links:
-                if link.get_text(strip=True) not in course_list and link.get_text(strip=True) != "":
-                    course_list.append(link.get_text(strip=True))
+def parse_courses_from_page(content):
+    document = parse_html(content)
+    courses_by_type = {}
 
-            next_element = next_element.find_next_sibling()
+    # Each requirement heading owns the links in its following siblings, up to the next h4
+    for heading in document.iter('h4'):
+        if not has_class(heading, REQUIREMENT_HEADING_CLASS):
+            continue
+
+        course_list = {}
+        for sibling in heading.itersiblings():
+            if not isinstance(sibling.tag, str):
+                continue  # comments and processing instructions
+            if sibling.tag == 'h4':
+                break
+            for link in sibling.iterdescendants('a'):
+                if has_class(link, COURSE_LINK_CLASS):
+                    code = stripped_text(link)
+                    if code:
+                        course_list.setdefault(code)
 
         if course_list:
-            courses_by_type[course_type_text] = course_list
+            courses_by_type[stripped_text(heading)] = list(course_list)
 
     return courses_by_type
 
@@ -46,36 +67,21 @@ def sort_course_types(course_types):
     ))
     return sorted_types
 
-def fetch_courses_for_degree(link):
-    degree_url = link[0]
-    print(f'Scraping courses from: {link[1]}')
-    courses = scrape_courses_from_page(degree_url)
-    return link[1], courses
+def sort_courses_by_type(courses_by_type):
+    return {course_type: courses_by_type[course_type] for course_type in sort_course_types(courses_by_type)}
 
 def get_all_major_courses():
     links = get_links_from_major_links()
-    course_list = {}
+    scraped = crawl(links, parse_courses_from_page, cache=catalog_cache, cache_key=f"requirements-v{PARSER_VERSION}")
+    print(f"Catalog cache: {catalog_cache.stats()}")
 
-    with ThreadPoolExecutor(max_workers=1) as executor:  
-        future_to_degree = {executor.submit(fetch_courses_for_degree, link): link[1] for link in links}
-
-        for future in as_completed(future_to_degree):
-            degree_name = future_to_degree[future]
-            try:
-                courses = future.result()
-                sorted_course_types = sort_course_types(courses[1])
-                
-                sorted_courses_by_type = {course_type: courses[1][course_type] for course_type in sorted_course_types}
-                course_list[degree_name] = sorted_courses_by_type
-
-                for course_type, course_list_for_type in sorted_courses_by_type.items():
-                    print(f'\nCourse Type: {course_type}')
-                    for course in course_list_for_type:
-                        print(f'  Course: {course}')
-                    print('-' * 40)
-            except Exception as exc:
-                print(f'{degree_name} generated an exception: {exc}')
+    # Keep the catalog's degree order rather than completion order
+    course_list = {}
+    for _, degree_name in links:
+        if degree_name in scraped:
+            course_list[degree_name] = sort_courses_by_type(scraped[degree_name])
 
+    print(f"Scraped course requirements for {len(course_list)} of {len(links)} degrees")
     return course_list
 
 if __name__ == '__main__':
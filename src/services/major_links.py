@@ -1,11 +1,37 @@
+import os
 import requests
 from bs4 import BeautifulSoup
 from contextlib import closing
+from src.services.http_cache import CacheMiss, catalog_cache
 
-def scrape_links_excluding_breadcrumb(base_url, section_id, breadcrumb_id):
-    with closing(requests.get(base_url, stream=True)) as response:
+# Overridable so the catalog can be served by a local stand-in (see benchmarks/stub_server.py)
+CATALOG_URL = os.environ.get("CATALOG_URL", "https://catalog.ucsc.edu/")
+
+def fetch_page(url, cache=catalog_cache):
+    # Returns (content, hash, changed); an unchanged page is answered from the cache
+    if cache.offline:
+        content, digest = cache.cached(url)
+        return content, digest, False
+    with closing(requests.get(url, stream=True, timeout=15, headers=cache.conditional_headers(url))) as response:
+        if response.status_code == 304:
+            return cache.not_modified(url)
         response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
+        return cache.store(url, response.content, response.headers)
+
+def scrape_links_excluding_breadcrumb(base_url, section_id, breadcrumb_id, cache=catalog_cache):
+    content, digest, changed = fetch_page(base_url, cache)
+    cache_key = f"links:{section_id}:{breadcrumb_id}"
+    if not changed:
+        links = cache.derived(base_url, digest, cache_key)
+        if links is not None:
+            return [tuple(link) for link in links]
+
+    links = parse_links_excluding_breadcrumb(content, section_id, breadcrumb_id)
+    cache.store_derived(base_url, digest, cache_key, links)
+    return links
+
+def parse_links_excluding_breadcrumb(content, section_id, breadcrumb_id):
+    soup = BeautifulSoup(content, 'html.parser')
 
     section = soup.find(id=section_id)
     
@@ -23,13 +49,13 @@ def scrape_links_excluding_breadcrumb(base_url, section_id, breadcrumb_id):
         href = link.get('href')
         text = link.get_text(strip=True)
         if href:
-            full_url = "https://catalog.ucsc.edu/" + href + "#degree-req-2"
+            full_url = CATALOG_URL + href + "#degree-req-2"
             links.append((full_url, text))
 
     return links
 
 def main():
-    base_url = 'https://catalog.ucsc.edu/en/current/general-catalog/academic-programs/bachelors-degrees/'
+    base_url = CATALOG_URL + 'en/current/general-catalog/academic-programs/bachelors-degrees/'
     section_id = 'main'
     breadcrumb_id = 'breadcrumb'
     
@@ -39,6 +65,9 @@ def main():
     except requests.RequestException as e:
         print(f"An error occurred while fetching the page: {e}")
         return []
+    except CacheMiss as e:
+        print(f"Offline mode and no cached copy of {e}")
+        return []
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
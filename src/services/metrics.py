@@ -0,0 +1,85 @@
+import os
+import time
+from contextlib import contextmanager
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# With several gunicorn workers each one has its own counters. Point
+# PROMETHEUS_MULTIPROC_DIR at an empty directory before starting them and
+# /metrics adds up every process's values (see gunicorn.conf.py).
+MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+SCRAPE_BUCKETS = (1, 2.5, 5, 10, 20, 30, 45, 60, 90, 120, 180, 300)
+REQUEST_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20)
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+SCRAPE_SECONDS = Histogram(
+    "ucsc_scrape_seconds", "Time to scrape every results page of one GE category",
+    ["ge", "outcome"], buckets=SCRAPE_BUCKETS,
+)
+SCRAPE_PAGES = Counter("ucsc_scrape_pages", "Results pages scraped", ["ge"])
+SCRAPE_ROWS = Counter("ucsc_scrape_rows", "Sections scraped", ["ge"])
+UPSTREAM_SECONDS = Histogram(
+    "ucsc_upstream_request_seconds", "Latency of class search requests and page loads",
+    ["engine", "kind"], buckets=REQUEST_BUCKETS,
+)
+PARSE_SECONDS = Histogram(
+    "ucsc_parse_seconds", "Time to turn one results page into courses",
+    ["engine"], buckets=FAST_BUCKETS,
+)
+DB_WRITE_SECONDS = Histogram(
+    "ucsc_db_write_seconds", "Time to check and sync one scraped category into the database",
+    ["term"], buckets=FAST_BUCKETS,
+)
+ROWS_CHANGED = Counter("ucsc_rows_changed", "Section rows written by category syncs", ["op"])
+REFRESH_SECONDS = Histogram(
+    "ucsc_refresh_seconds", "Duration of one scheduled category refresh",
+    ["term", "outcome"], buckets=SCRAPE_BUCKETS,
+)
+REFRESH_OVERRUNS = Counter(
+    "ucsc_refresh_overruns", "Scheduled refreshes that took longer than their interval", ["term", "ge"],
+)
+REQUEST_SECONDS = Histogram(
+    "ucsc_http_request_seconds", "API latency per route, up to the first byte for streamed responses",
+    ["route", "method", "status"], buckets=FAST_BUCKETS,
+)
+CACHE_LOOKUPS = Counter("ucsc_cache_lookups", "Cache lookups by cache and result", ["cache", "result"])
+
+
+@contextmanager
+def timed(histogram, *labels):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.labels(*labels).observe(time.perf_counter() - started)
+
+
+def record_sync(term, result, seconds):
+    DB_WRITE_SECONDS.labels(term).observe(seconds)
+    for op in ("inserted", "updated", "deleted"):
+        count = getattr(result, op)
+        if count:
+            ROWS_CHANGED.labels(op).inc(count)
+
+
+def exposition():
+    # -> (body, content type) for the /metrics endpoint
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid):
+    if MULTIPROC_DIR:
+        multiprocess.mark_process_dead(pid)
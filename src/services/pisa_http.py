@@ -0,0 +1,135 @@
+import os
+import queue
+import requests
+from requests.adapters import HTTPAdapter
+from src.services.class_search_parser import (
+    CLASS_SEARCH_URL as DEFAULT_CLASS_SEARCH_URL,
+    extract_rows,
+    form_fields,
+    has_next_page,
+    parse_document,
+    rows_to_courses,
+    search_form,
+    selected_term,
+    term_options,
+)
+from src.services.metrics import PARSE_SECONDS, UPSTREAM_SECONDS, timed
+
+CLASS_SEARCH_URL = os.environ.get("PISA_CLASS_SEARCH_URL", DEFAULT_CLASS_SEARCH_URL)
+REQUEST_TIMEOUT = 20  # seconds
+MAX_PAGES = 200
+
+
+class SessionPool:
+    def __init__(self, size=10):
+        self.size = size
+        self.sessions = queue.LifoQueue()
+        for _ in range(size):
+            self.sessions.put(None)
+
+    def create_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2, max_retries=2)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers["User-Agent"] = "UCSC-Course/1.0"
+        return session
+
+    def get_session(self):
+        session = self.sessions.get()
+        return session if session is not None else self.create_session()
+
+    def return_session(self, session, broken=False):
+        if broken:
+            session.close()
+            session = None
+        self.sessions.put(session)
+
+
+session_pool = SessionPool()
+
+
+def current_terms():
+    # ((value, name) of the term the class search has selected by default,
+    # {value: name} of every term it offers)
+    session = session_pool.get_session()
+    broken = False
+    try:
+        response = session.get(CLASS_SEARCH_URL, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        document = parse_document(response.content)
+        return selected_term(document), term_options(document)
+    except Exception:
+        broken = True
+        raise
+    finally:
+        session_pool.return_session(session, broken)
+
+
+def scrape_course_pages(ge_choice, on_page, term=None):
+    # Calls on_page(courses) for each results page as soon as it is parsed.
+    # Errors propagate so a partial scrape is never mistaken for a full one.
+    # Without a term, whatever term the search form has selected is scraped.
+    session = session_pool.get_session()
+    broken = False
+
+    try:
+        with timed(UPSTREAM_SECONDS, "http", "form"):
+            response = session.get(CLASS_SEARCH_URL, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        document = parse_document(response.content)
+
+        term_value, term_name = selected_term(document)
+        if term is not None and term != term_value:
+            if not document.xpath("//select[@id='term_dropdown']/option[@value=$term]", term=term):
+                raise ValueError(f"term {term} is not offered by the class search")
+            term_value = term
+        print(f"Scraping {ge_choice} for term {term_value}")
+
+        form = search_form(document)
+        if form is None:
+            raise ValueError("class search form not found")
+        fields = form_fields(form)
+        fields["action"] = "results"
+        fields["binds[:ge]"] = ge_choice
+        if term_value:
+            fields["binds[:term]"] = term_value
+
+        seen = set()
+        for number in range(1, MAX_PAGES + 1):
+            with timed(UPSTREAM_SECONDS, "http", fields["action"]):
+                response = session.post(CLASS_SEARCH_URL, data=fields, timeout=REQUEST_TIMEOUT)
+            response.raise_for_status()
+            with timed(PARSE_SECONDS, "http"):
+                document = parse_document(response.content)
+                rows = extract_rows(document, base_url=CLASS_SEARCH_URL)
+                page = rows_to_courses(rows, ge_choice)
+            if not rows:
+                # Only the first page may be empty: the search found nothing
+                if number == 1:
+                    break
+                raise ValueError(f"{ge_choice} results page {number} has no rows")
+            if not page:
+                raise ValueError(f"{ge_choice} results page {number}: none of its {len(rows)} rows could be read")
+            new_rows = [course for course in page if course.enroll_num not in seen]
+            if not new_rows:
+                raise ValueError(f"{ge_choice} results page {number} has no new sections")
+            seen.update(course.enroll_num for course in new_rows)
+            on_page(new_rows)
+
+            if not has_next_page(document):
+                break
+            form = search_form(document)
+            if form is None:
+                raise ValueError(f"{ge_choice} results have a next page but no form to request it")
+            fields = form_fields(form)
+            fields["action"] = "next"
+        else:
+            raise ValueError(f"{ge_choice} still has a next page after {MAX_PAGES} pages")
+
+    except Exception:
+        broken = True
+        raise
+    finally:
+        session_pool.return_session(session, broken)
+
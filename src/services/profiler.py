@@ -0,0 +1,109 @@
+import collections
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+SAMPLE_INTERVAL = float(os.environ.get("PROFILE_SAMPLE_INTERVAL", 0.005))  # seconds
+
+
+def frame_stack(frame):
+    # root-first "file:function:line" entries
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+class SamplingProfiler:
+    # Samples the stacks of the profiled thread and of the threads it starts
+    # from a background thread. Those are the threads named threads_0,
+    # threads_1, ... (a ThreadPoolExecutor's thread_name_prefix), or without a
+    # prefix every thread started while profiling. Costs nothing when not
+    # running, so it can be switched on in production.
+    def __init__(self, interval=SAMPLE_INTERVAL, threads=None):
+        self.interval = interval
+        self.threads = threads
+        self.counts = collections.Counter()
+        self.samples = 0
+        self.started = None
+        self.elapsed = 0.0
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.target = threading.get_ident()
+        self.ignored = set(sys._current_frames()) - {self.target}
+        self.started = time.perf_counter()
+        self.thread = threading.Thread(target=self._sample, name="profiler", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.thread.join()
+        self.elapsed = time.perf_counter() - self.started
+
+    def _sample(self):
+        me = threading.get_ident()
+        names = {}
+        while not self.stop_event.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == me or ident in self.ignored:
+                    continue
+                if ident not in names:
+                    names[ident] = next((t.name for t in threading.enumerate() if t.ident == ident), str(ident))
+                if self.threads and ident != self.target and not names[ident].startswith(self.threads + "_"):
+                    continue
+                self.counts[(names[ident],) + tuple(frame_stack(frame))] += 1
+            self.samples += 1
+
+    def collapsed(self):
+        # Brendan Gregg's folded format, one "thread;frame;...;frame count" per
+        # line, readable by flamegraph.pl and speedscope
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.counts.most_common())
+
+    def top(self, limit=15):
+        # (frame, samples it was on top of a stack in)
+        leaves = collections.Counter()
+        for stack, count in self.counts.items():
+            leaves[stack[-1]] += count
+        return leaves.most_common(limit)
+
+    def write(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(self.collapsed())
+
+
+def take_flag(path):
+    # True once per flag file: it is removed so only one cycle is profiled
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+@contextmanager
+def profile_once(flag_path, output_dir, label, threads=None):
+    # Profiles the enclosed block if the flag file exists and writes the
+    # folded stacks to output_dir/<label>-<time>.folded
+    if not take_flag(flag_path):
+        yield None
+        return
+    profiler = SamplingProfiler(threads=threads)
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        path = os.path.join(output_dir, f"{label}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.folded")
+        profiler.write(path)
+        print(f"Profiled {label}: {profiler.samples} samples over {profiler.elapsed:.1f}s written to {path}")
+        for frame, count in profiler.top(5):
+            print(f"  {count:6d}  {frame}")
@@ -0,0 +1,181 @@
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+import pytz
+from apscheduler.jobstores.base import JobLookupError
+from src.services.metrics import REFRESH_OVERRUNS, REFRESH_SECONDS
+
+CAMPUS_TZ = pytz.timezone('America/Los_Angeles')
+
+
+def parse_windows(text):
+    # "2026-11-10:2026-11-25,2027-02-16:2027-03-01" -> [(date, date), ...]
+    windows = []
+    for part in (text or "").split(","):
+        if not part.strip():
+            continue
+        start, end = part.split(":")
+        windows.append((date.fromisoformat(start.strip()), date.fromisoformat(end.strip())))
+    return windows
+
+
+class RefreshPolicy:
+    # Decides how long a category waits before its next refresh
+    def __init__(self, base=30, minimum=15, maximum=900, grow=1.5, shrink=0.5,
+                 overnight_hours=(1, 6), overnight_factor=4, enrollment_windows=(),
+                 enrollment_factor=0.5, max_backoff=1800):
+        self.base = base
+        self.minimum = minimum
+        self.maximum = maximum
+        self.grow = grow
+        self.shrink = shrink
+        self.overnight_hours = overnight_hours
+        self.overnight_factor = overnight_factor
+        self.enrollment_windows = list(enrollment_windows)
+        self.enrollment_factor = enrollment_factor
+        self.max_backoff = max_backoff
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            base=int(os.environ.get("REFRESH_INTERVAL", 30)),
+            enrollment_windows=parse_windows(os.environ.get("ENROLLMENT_WINDOWS")),
+        )
+
+    def adapt(self, interval, changed):
+        # Categories that keep changing are polled more often, quiet ones less
+        interval = interval * (self.shrink if changed else self.grow)
+        return min(self.maximum, max(self.minimum, interval))
+
+    def time_factor(self, now):
+        local = now.astimezone(CAMPUS_TZ)
+        if any(start <= local.date() <= end for start, end in self.enrollment_windows):
+            return self.enrollment_factor
+        start, end = self.overnight_hours
+        if start <= local.hour < end:
+            return self.overnight_factor
+        return 1
+
+    def backoff(self, failures):
+        return min(self.max_backoff, self.base * (2 ** failures))
+
+    def delay(self, state, now):
+        if state.failures:
+            return self.backoff(state.failures)
+        return state.interval * self.time_factor(now)
+
+
+class CategoryState:
+    def __init__(self, name, interval):
+        self.name = name
+        self.interval = interval
+        self.failures = 0
+        self.runs = 0
+        self.overruns = 0  # runs that took longer than the interval they were given
+        self.last_run = None
+        self.last_duration = None
+        self.last_changed = None
+        self.last_error = None
+        self.next_run = None
+
+    def as_dict(self):
+        return {
+            "interval": round(self.interval, 1),
+            "failures": self.failures,
+            "runs": self.runs,
+            "overruns": self.overruns,
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+            "last_duration": round(self.last_duration, 3) if self.last_duration is not None else None,
+            "last_changed": self.last_changed,
+            "last_error": self.last_error,
+            "next_run": self.next_run.isoformat() if self.next_run else None,
+        }
+
+
+class AdaptiveRefreshScheduler:
+    # One job per category on an APScheduler scheduler. Each run sets its own
+    # next run time when it finishes, and max_instances=1/coalesce=True make
+    # sure runs of a category never overlap and missed runs collapse into one.
+    def __init__(self, scheduler, refresh, categories, policy=None, stagger=2, name=None):
+        self.scheduler = scheduler
+        self.name = name  # keeps job ids apart when several of these share a scheduler
+        self.refresh = refresh  # refresh(category) -> number of rows changed
+        self.policy = policy or RefreshPolicy.from_env()
+        self.stagger = stagger
+        self.lock = threading.Lock()
+        self.states = {category: CategoryState(category, self.policy.base) for category in categories}
+
+    def job_id(self, category):
+        return f"refresh_{self.name}_{category}" if self.name else f"refresh_{category}"
+
+    def start(self, initial_delay=0):
+        now = datetime.now(pytz.utc)
+        for i, category in enumerate(self.states):
+            run_date = now + timedelta(seconds=initial_delay + i * self.stagger)
+            self.states[category].next_run = run_date
+            self.scheduler.add_job(
+                self.run,
+                'interval',
+                # Only a fallback: every run sets the next run time itself
+                seconds=self.policy.max_backoff * 2,
+                next_run_time=run_date,
+                args=[category],
+                id=self.job_id(category),
+                replace_existing=True,
+                max_instances=1,
+                coalesce=True,
+                misfire_grace_time=None,
+            )
+
+    def stop(self):
+        for category in self.states:
+            try:
+                self.scheduler.remove_job(self.job_id(category))
+            except JobLookupError:
+                pass
+
+    def _schedule(self, category, run_date):
+        with self.lock:
+            self.states[category].next_run = run_date
+        self.scheduler.modify_job(self.job_id(category), next_run_time=run_date)
+
+    def run(self, category):
+        state = self.states[category]
+        started = time.monotonic()
+        with self.lock:
+            budget = self.policy.delay(state, datetime.now(pytz.utc))
+        outcome = "error"
+        try:
+            changed = self.refresh(category)
+            outcome = "ok"
+            with self.lock:
+                state.failures = 0
+                state.last_error = None
+                state.last_changed = changed
+                state.interval = self.policy.adapt(state.interval, bool(changed))
+        except Exception as e:
+            with self.lock:
+                state.failures += 1
+                state.last_error = str(e)
+            print(f"Refreshing {category} failed ({state.failures} in a row): {e}")
+        finally:
+            now = datetime.now(pytz.utc)
+            with self.lock:
+                state.runs += 1
+                state.last_run = now
+                state.last_duration = time.monotonic() - started
+                overran = state.last_duration > budget
+                state.overruns += overran
+                delay = self.policy.delay(state, now)
+            REFRESH_SECONDS.labels(self.name or "", outcome).observe(state.last_duration)
+            if overran:
+                REFRESH_OVERRUNS.labels(self.name or "", category).inc()
+            try:
+                self._schedule(category, now + timedelta(seconds=delay))
+            except JobLookupError:
+                pass  # stopped while this run was in progress
+
+    def status(self):
+        with self.lock:
+            return {category: state.as_dict() for category, state in self.states.items()}
@@ -0,0 +1,53 @@
+import hashlib
+import json
+import threading
+from src.services.metrics import CACHE_LOOKUPS
+
+
+class CachedResponse:
+    __slots__ = ("body", "etag")
+
+    def __init__(self, body):
+        self.body = body
+        self.etag = hashlib.sha1(body).hexdigest()
+
+
+def serialize(payload):
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+class ResponseCache:
+    # Ready-to-send JSON bodies for one snapshot generation. Entries are
+    # dropped as soon as a newer generation is seen.
+    def __init__(self, name="responses"):
+        self.name = name
+        self.lock = threading.Lock()
+        self.generation = None
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, generation, key, build):
+        with self.lock:
+            if generation == self.generation and key in self.entries:
+                self.hits += 1
+                CACHE_LOOKUPS.labels(self.name, "hit").inc()
+                return self.entries[key]
+            self.misses += 1
+        CACHE_LOOKUPS.labels(self.name, "miss").inc()
+
+        entry = CachedResponse(serialize(build()))
+        with self.lock:
+            if generation != self.generation:
+                if self.generation is not None and generation < self.generation:
+                    return entry
+                self.generation = generation
+                self.entries = {}
+            self.entries[key] = entry
+        return entry
+
+    def reset(self, generation):
+        with self.lock:
+            if self.generation is None or generation >= self.generation:
+                self.generation = generation
+                self.entries = {}
@@ -0,0 +1,42 @@
+import re
+
+DAYS = ("M", "Tu", "W", "Th", "F", "Sa", "Su")
+
+SCHEDULE_PATTERN = re.compile(
+    r"^\s*((?:M|Tu|W|Th|F|Sa|Su)+)\s+(\d{1,2}:\d{2}\s*[AP]M)\s*-\s*(\d{1,2}:\d{2}\s*[AP]M)",
+    re.IGNORECASE,
+)
+DAY_PATTERN = re.compile(r"Tu|Th|Sa|Su|M|W|F", re.IGNORECASE)
+TIME_PATTERN = re.compile(r"^\s*(\d{1,2}):(\d{2})\s*([AP]M)?\s*$", re.IGNORECASE)
+
+
+def parse_days(text):
+    days = []
+    for token in DAY_PATTERN.findall(text or ""):
+        day = token[0].upper() + token[1:].lower()
+        if day not in days:
+            days.append(day)
+    return tuple(days)
+
+
+def parse_time(text):
+    # "10:40AM" or 24-hour "13:20" -> minutes after midnight
+    match = TIME_PATTERN.match(text or "")
+    if not match:
+        raise ValueError(f"invalid time: {text!r}")
+    hours, minutes, meridiem = int(match.group(1)), int(match.group(2)), match.group(3)
+    if meridiem:
+        if not 1 <= hours <= 12:
+            raise ValueError(f"invalid time: {text!r}")
+        hours = hours % 12 + (12 if meridiem.upper() == "PM" else 0)
+    if hours > 23 or minutes > 59:
+        raise ValueError(f"invalid time: {text!r}")
+    return hours * 60 + minutes
+
+
+def parse_schedule(text):
+    # "MWF 10:40AM-11:45AM" -> (("M", "W", "F"), 640, 705); None for "TBA" and the like
+    match = SCHEDULE_PATTERN.match(text or "")
+    if not match:
+        return None
+    return parse_days(match.group(1)), parse_time(match.group(2)), parse_time(match.group(3))
@@ -0,0 +1,86 @@
+import re
+import numpy as np
+from src.services.schedule import DAYS, parse_days, parse_schedule, parse_time
+
+SLOT_MINUTES = 5
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+WEEK_SLOTS = len(DAYS) * SLOTS_PER_DAY  # 2016
+MASK_WORDS = -(-WEEK_SLOTS // 64)  # 32 uint64 words per section
+
+BUSY_PATTERN = re.compile(r"^\s*([A-Za-z]+)\s+(\d{1,2}:\d{2}\s*(?:[AP]M)?)\s*-\s*(\d{1,2}:\d{2}\s*(?:[AP]M)?)\s*$", re.IGNORECASE)
+
+
+def _mark(bits, days, start, end):
+    # Sets every 5-minute slot that overlaps [start, end) on the given days
+    first = start // SLOT_MINUTES
+    last = -(-end // SLOT_MINUTES)
+    for day in days:
+        offset = DAYS.index(day) * SLOTS_PER_DAY
+        bits[offset + first:offset + last] = True
+
+
+def _pack(bits):
+    # bool (..., MASK_WORDS * 64) -> uint64 (..., MASK_WORDS)
+    packed = np.packbits(bits, axis=-1, bitorder="little")
+    return packed.view("<u8")
+
+
+def meeting_mask(days, start, end):
+    bits = np.zeros(MASK_WORDS * 64, dtype=bool)
+    _mark(bits, days, start, end)
+    return _pack(bits)
+
+
+def parse_busy(text):
+    # "MWF 9:00AM-10:00AM; TuTh 13:00-14:30" -> one mask for all the busy slots
+    bits = np.zeros(MASK_WORDS * 64, dtype=bool)
+    for part in re.split(r"[;|]", text or ""):
+        if not part.strip():
+            continue
+        match = BUSY_PATTERN.match(part)
+        if not match:
+            raise ValueError(f"invalid busy slot: {part.strip()!r}")
+        days = parse_days(match.group(1))
+        start, end = parse_time(match.group(2)), parse_time(match.group(3))
+        if not days or end <= start:
+            raise ValueError(f"invalid busy slot: {part.strip()!r}")
+        _mark(bits, days, start, end)
+    return _pack(bits)
+
+
+class ScheduleMasks:
+    # One row of MASK_WORDS uint64 words per snapshot row, bit i set when the
+    # section meets during week slot i. Sections without a fixed meeting time
+    # ("TBA", asynchronous online) have an empty mask and never conflict.
+    def __init__(self, rows):
+        bits = np.zeros((len(rows), MASK_WORDS * 64), dtype=bool)
+        self.scheduled = np.zeros(len(rows), dtype=bool)
+        parsed = {}
+        for position, row in enumerate(rows):
+            text = row["schedule"]
+            if text not in parsed:
+                parsed[text] = parse_schedule(text)
+            meeting = parsed[text]
+            if meeting is not None:
+                _mark(bits[position], *meeting)
+                self.scheduled[position] = True
+        # Stored word-major, so each word of the week is one contiguous column
+        self.masks = np.asfortranarray(_pack(bits))
+
+    def conflicts(self, busy):
+        # bool per row: does the section overlap any busy slot. A timetable
+        # only touches a few of the 32 words, so only those columns are read.
+        conflicts = np.zeros(len(self.scheduled), dtype=bool)
+        for word in np.flatnonzero(busy):
+            conflicts |= np.bitwise_and(self.masks[:, word], busy[word]) != 0
+        return conflicts
+
+    def fitting(self, busy, positions=None, scheduled_only=False):
+        # Positions (in snapshot order) of sections that do not overlap `busy`
+        fits = ~self.conflicts(busy)
+        if scheduled_only:
+            fits &= self.scheduled
+        if positions is None:
+            return np.flatnonzero(fits).tolist()
+        positions = np.asarray(positions, dtype=np.intp)
+        return positions[fits[positions]].tolist()
@@ -0,0 +1,140 @@
+import heapq
+import re
+from collections import defaultdict
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+CODE_PATTERN = re.compile(r"^\s*([A-Za-z]+)\s+(\d+[A-Za-z]*)")
+
+# Field weights: a hit on the course code outranks a title hit, which outranks an instructor hit
+FIELD_WEIGHTS = (("code", 3.0), ("name", 2.0), ("instructor", 1.0))
+MAX_PREFIX = 12
+FUZZY_MIN_LENGTH = 3
+FUZZY_THRESHOLD = 0.4
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall((text or "").lower())
+
+
+def trigrams(token):
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b, limit):
+    # Optimal string alignment distance (adjacent swaps count as one edit), cut off past limit
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if previous2 is not None and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def course_tokens(code):
+    tokens = tokenize(code)
+    match = CODE_PATTERN.match(code or "")
+    if match:
+        # "CSE 20 - 01" also answers to "cse20"
+        tokens.append((match.group(1) + match.group(2)).lower())
+    return tokens
+
+
+class SearchIndex:
+    # Prefix and trigram indexes over code, title and instructor for one snapshot
+    def __init__(self, rows):
+        self.rows = []
+        self.ges = []  # a section listed under several GE categories is indexed once
+        self.terms = []  # per document: token -> best field weight
+        self.prefixes = defaultdict(set)  # prefix -> token
+        self.postings = defaultdict(list)  # token -> documents
+        self.grams = defaultdict(set)  # trigram -> token
+        seen = {}
+
+        for row in rows:
+            if row["enroll_num"] in seen:
+                self.ges[seen[row["enroll_num"]]].add(row["ge"])
+                continue
+            document = seen[row["enroll_num"]] = len(self.rows)
+            self.rows.append(row)
+            self.ges.append({row["ge"]})
+
+            terms = {}
+            for field, weight in FIELD_WEIGHTS:
+                tokens = course_tokens(row[field]) if field == "code" else tokenize(row[field])
+                for token in tokens:
+                    if terms.get(token, 0) < weight:
+                        terms[token] = weight
+            self.terms.append(terms)
+            for token in terms:
+                self.postings[token].append(document)
+
+        for token in self.postings:
+            for length in range(1, min(len(token), MAX_PREFIX) + 1):
+                self.prefixes[token[:length]].add(token)
+            for gram in trigrams(token):
+                self.grams[gram].add(token)
+
+    def _expand(self, query_token, last):
+        # Returns {token: match quality}. Only the token being typed is a prefix.
+        matches = {}
+        if query_token in self.postings:
+            matches[query_token] = 1.0
+        if last:
+            if len(query_token) <= MAX_PREFIX:
+                candidates = self.prefixes.get(query_token, ())
+            else:
+                candidates = [t for t in self.prefixes.get(query_token[:MAX_PREFIX], ()) if t.startswith(query_token)]
+            for token in candidates:
+                matches.setdefault(token, 0.8)
+        if not matches and len(query_token) >= FUZZY_MIN_LENGTH:
+            query_grams = trigrams(query_token)
+            counts = defaultdict(int)
+            for gram in query_grams:
+                for token in self.grams.get(gram, ()):
+                    counts[token] += 1
+            max_edits = 1 if len(query_token) < 6 else 2
+            for token, shared in counts.items():
+                similarity = shared / (len(query_grams) + len(token) + 1 - shared)
+                if similarity >= FUZZY_THRESHOLD:
+                    matches[token] = 0.5 * similarity
+                elif shared >= 2:
+                    edits = edit_distance(query_token, token, max_edits)
+                    if edits <= max_edits:
+                        matches[token] = 0.5 - 0.1 * edits
+        return matches
+
+    def search(self, query, limit=20, ge=None):
+        query_tokens = tokenize(query)
+        if not query_tokens:
+            return []
+
+        scores = None
+        for i, query_token in enumerate(query_tokens):
+            token_scores = defaultdict(float)
+            for token, quality in self._expand(query_token, i == len(query_tokens) - 1).items():
+                for document in self.postings[token]:
+                    score = quality * self.terms[document][token]
+                    if score > token_scores[document]:
+                        token_scores[document] = score
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {d: s + token_scores[d] for d, s in scores.items() if d in token_scores}
+            if not scores:
+                return []
+
+        if ge is not None:
+            scores = {d: s for d, s in scores.items() if ge in self.ges[d]}
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [self.rows[document] for document, _ in best]
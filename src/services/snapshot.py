@@ -0,0 +1,91 @@
+import threading
+
+
+class CourseSnapshot:
+    # An immutable, complete view of the section table for one generation.
+    # Readers hold a reference to it, so a refresh can never change it under them.
+    def __init__(self, generation, rows, created_at=None, term=None):
+        self.generation = generation
+        self.term = term
+        self.rows = tuple(rows)
+        self.created_at = created_at
+        self.lock = threading.Lock()
+        self.cache = {}
+
+    def derived(self, name, build):
+        # Per-snapshot structures (indexes and the like), built once and
+        # discarded together with the snapshot
+        if name in self.cache:
+            return self.cache[name]
+        with self.lock:
+            if name not in self.cache:
+                self.cache[name] = build(self.rows)
+            return self.cache[name]
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __repr__(self):
+        return f"CourseSnapshot(term={self.term}, generation={self.generation}, rows={len(self.rows)})"
+
+
+class SnapshotStore:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._current = None
+        self.listeners = []
+
+    @property
+    def current(self):
+        return self._current
+
+    def publish(self, snapshot):
+        with self.lock:
+            if self._current is not None and snapshot.generation < self._current.generation:
+                return False
+            # A single reference swap; the previous generation is freed once its last reader is done
+            self._current = snapshot
+            listeners = list(self.listeners)
+        for listener in listeners:
+            try:
+                listener(snapshot)
+            except Exception as e:
+                print(f"Error in snapshot listener: {e}")
+        return True
+
+    def subscribe(self, listener):
+        with self.lock:
+            self.listeners.append(listener)
+        return listener
+
+
+class TermSnapshots:
+    # One SnapshotStore per term, so terms publish and cache independently.
+    # Listeners subscribed here see publishes from every term.
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stores = {}
+        self.listeners = []
+
+    def store(self, term):
+        with self.lock:
+            store = self.stores.get(term)
+            if store is None:
+                store = self.stores[term] = SnapshotStore()
+                store.listeners.extend(self.listeners)
+            return store
+
+    def current(self, term):
+        store = self.stores.get(term)
+        return store.current if store is not None else None
+
+    def publish(self, snapshot):
+        return self.store(snapshot.term).publish(snapshot)
+
+    def subscribe(self, listener):
+        with self.lock:
+            self.listeners.append(listener)
+            stores = list(self.stores.values())
+        for store in stores:
+            store.subscribe(listener)
+        return listener
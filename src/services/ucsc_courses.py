@@ -3,26 +3,71 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from src.services.course import Course
-import concurrent.futures
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from src.services.class_search_parser import NEXT_XPATH, extract_rows, parse_document, rows_to_courses
+from src.services import pisa_http
+from src.services.course_pipeline import CoursePipeline
+from src.services.metrics import PARSE_SECONDS, UPSTREAM_SECONDS, timed
+import atexit
+import functools
+import os
+import sys
 import threading
 import time
 from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
 
-class WebDriverManager:
-    def __init__(self):
-        self.lock = threading.Lock()
-        self.driver_pool = []
-        self.max_drivers = 10
+SELENIUM_URL = os.environ.get("SELENIUM_URL", "http://selenium:4444/wd/hub")
 
-    def get_driver(self):
+class WebDriverManager:
+    def __init__(self, max_drivers=10, acquire_timeout=60, idle_timeout=600):
+        self.lock = threading.Condition()
+        self.driver_pool = []  # idle (driver, returned_at), most recently used last
+        self.max_drivers = max_drivers
+        self.acquire_timeout = acquire_timeout  # seconds
+        self.idle_timeout = idle_timeout  # seconds
+        self.live = 0  # sessions alive, idle or checked out
+        self.created = 0
+        self.discarded = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def get_driver(self, timeout=None):
+        timeout = self.acquire_timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
         with self.lock:
+            self._evict_idle()
+            while not self.driver_pool and self.live >= self.max_drivers:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    return None
+                self.lock.wait(remaining)
             if self.driver_pool:
-                return self.driver_pool.pop()
-            elif len(self.driver_pool) < self.max_drivers:
-                return self.create_driver()
+                driver, _ = self.driver_pool.pop()
             else:
-                return None
+                driver = None
+                self.live += 1  # reserve the slot before creating outside the lock
+            self._record_wait(time.monotonic() - started)
+
+        if driver is not None:
+            if self.is_alive(driver):
+                return driver
+            self._discard(driver)
+            return self.get_driver(max(deadline - time.monotonic(), 0))
+
+        try:
+            driver = self.create_driver()
+        except Exception:
+            with self.lock:
+                self.live -= 1
+                self.lock.notify()
+            raise
+        with self.lock:
+            self.created += 1
+        return driver
 
     def create_driver(self):
         chrome_options = Options()
@@ -32,94 +77,129 @@ class WebDriverManager:
 
         chrome_options.add_argument("--headless")
         return webdriver.Remote(
-            command_executor='http://selenium:4444/wd/hub',
+            command_executor=SELENIUM_URL,
             options=chrome_options
         )
-    def return_driver(self, driver):
+
+    def is_alive(self, driver):
+        try:
+            driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def return_driver(self, driver, broken=False):
+        if broken:
+            self._discard(driver)
+            return
         with self.lock:
-            self.driver_pool.append(driver)
+            self.driver_pool.append((driver, time.monotonic()))
+            self.lock.notify()
 
     def close_all(self):
         with self.lock:
-            for driver in self.driver_pool:
-                driver.quit()
+            idle = [driver for driver, _ in self.driver_pool]
             self.driver_pool.clear()
+        for driver in idle:
+            self._discard(driver)
 
-driver_manager = WebDriverManager()
+    def stats(self):
+        with self.lock:
+            return {
+                "live": self.live,
+                "idle": len(self.driver_pool),
+                "in_use": self.live - len(self.driver_pool),
+                "max": self.max_drivers,
+                "created": self.created,
+                "discarded": self.discarded,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_avg": self.wait_total / self.checkouts if self.checkouts else 0.0,
+                "wait_max": self.wait_max,
+            }
+
+    def _record_wait(self, waited):
+        self.checkouts += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+
+    def _evict_idle(self):
+        # Called with the lock held; the oldest idle sessions sit at the front
+        cutoff = time.monotonic() - self.idle_timeout
+        while self.driver_pool and self.driver_pool[0][1] < cutoff:
+            driver, _ = self.driver_pool.pop(0)
+            threading.Thread(target=self._discard, args=(driver,), daemon=True).start()
+
+    def _discard(self, driver):
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"Error closing WebDriver session: {e}")
+        with self.lock:
+            self.live -= 1
+            self.discarded += 1
+            self.lock.notify()
 
-def process_page(driver, class_list):
-    try:
-        class_rows = WebDriverWait(driver, 10).until(
-            EC.presence_of_all_elements_located((By.CSS_SELECTOR, 'div.panel.panel-default.row'))
+driver_manager = WebDriverManager()
+atexit.register(driver_manager.close_all)
+
+# Pulls every result row in a single WebDriver call instead of ~8 per row
+EXTRACT_ROWS_SCRIPT = """
+var texts = function (row, selector) {
+    return Array.prototype.map.call(row.querySelectorAll(selector), function (el) {
+        return el.innerText.replace(/\\s+/g, ' ').trim();
+    });
+};
+return Array.prototype.map.call(document.querySelectorAll('div.panel.panel-default.row'), function (row) {
+    var link = row.querySelector('a');
+    return {
+        link: link ? link.href : '',
+        title: link ? link.innerText : '',
+        cols3: texts(row, 'div.col-xs-6.col-sm-3'),
+        cols3_hide: texts(row, 'div.col-xs-6.col-sm-3.hide-print'),
+        cols6: texts(row, 'div.col-xs-6.col-sm-6')
+    };
+});
+"""
+# "script" runs EXTRACT_ROWS_SCRIPT in the browser, "source" fetches page_source and parses it locally
+EXTRACT_MODE = os.environ.get("SELENIUM_EXTRACT_MODE", "script")
+
+def process_page(driver, on_page, ge_choice=None):
+    # Errors propagate, so a page that fails to load ends the scrape with an
+    # error rather than looking like the last page
+    with timed(UPSTREAM_SECONDS, "selenium", "page"):
+        WebDriverWait(driver, 10).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, 'div.panel.panel-default.row'))
         )
 
-        for row in class_rows:
-            link_element = row.find_element(By.TAG_NAME, 'a')
-            link_url = link_element.get_attribute('href')  
-
-            link_text = link_element.text.split("   ")
-            class_code = link_text[0]
-            class_name = link_text[1] if len(link_text) > 1 else ""
-
-            enroll_num = row.find_elements(By.CSS_SELECTOR, 'div.col-xs-6.col-sm-3')[0]
-            enroll_num = enroll_num.text.replace("Class Number: ","")
-
-            teacher_div = row.find_elements(By.CSS_SELECTOR, 'div.col-xs-6.col-sm-3')[1]
-            teacher_name = teacher_div.text.replace('\n', ' ')
-            teacher_name = teacher_name.replace('Instructor: ', '')
-
-            names = teacher_name.split(",")
-            teacher_name = names[1].strip() + " " + names[0].strip() if len(names) > 1 else teacher_name
-
-            class_div = row.find_elements(By.CSS_SELECTOR, 'div.col-xs-6.col-sm-3.hide-print')[2]
-            class_type = class_div.text.replace('\n', ' ')
-            class_type = class_type.replace("Instruction Mode: ","")
-
-            class_count = row.find_elements(By.CSS_SELECTOR, 'div.col-xs-6.col-sm-3')[2].text
-            enrolled, total = map(int, class_count.split(" ")[0:3:2])
-            class_count = f"{total - enrolled}/{total}"
-
-            schedule_div = row.find_elements(By.CSS_SELECTOR, 'div.col-xs-6.col-sm-6')[1]
-            schedule = schedule_div.text.replace('\n',' ')
-            schedule = schedule.replace("Day and Time: ","")
-
-            location_div = row.find_elements(By.CSS_SELECTOR, 'div.col-xs-6.col-sm-6')[0]
-            location = location_div.text.replace('\n',' ')
-            location = location.replace("Location: ","")
-
-            class_list.append(Course(
-                code=class_code,
-                name=class_name,
-                instructor=teacher_name,
-                link=link_url, 
-                class_count=class_count,
-                enroll_num=enroll_num,
-                class_type=class_type,
-                schedule=schedule,
-                location=location
-            ))
-
-        return True
-    except Exception as e:
-        print(f"Error processing page: {e}")
-        return False
-
-def scrape_courses(ge_choice):
+    # Includes the WebDriver round trip(s) that fetch the rows
+    with timed(PARSE_SECONDS, "selenium"):
+        if EXTRACT_MODE == "source":
+            rows = extract_rows(parse_document(driver.page_source))
+        else:
+            rows = driver.execute_script(EXTRACT_ROWS_SCRIPT)
+        courses = rows_to_courses(rows, ge_choice)
+
+    on_page(courses)
+
+def scrape_course_pages(ge_choice, on_page, term=None):
     driver = driver_manager.get_driver()
     if not driver:
-        print(f"No available driver for {ge_choice}. Skipping.")
-        return []
+        raise RuntimeError(f"No available driver for {ge_choice}")
 
-    class_list = []
+    broken = False
 
     try:
-        driver.get("https://pisa.ucsc.edu/class_search/index.php")
+        with timed(UPSTREAM_SECONDS, "selenium", "form"):
+            driver.get(pisa_http.CLASS_SEARCH_URL)
 
         term_dropdown = WebDriverWait(driver, 10).until(
             EC.presence_of_element_located((By.ID, 'term_dropdown'))
         )
+        if term is not None:
+            term_dropdown.find_element(By.XPATH, f"./option[@value='{term}']").click()
         selected_option = term_dropdown.find_element(By.CSS_SELECTOR, 'option:checked')
-        print(f"Current Quarter: {selected_option.text}")
+        print(f"Scraping {ge_choice} for {selected_option.text}")
 
         ge_dropdown = WebDriverWait(driver, 10).until(
             EC.presence_of_element_located((By.ID, 'ge'))
@@ -134,52 +214,67 @@ def scrape_courses(ge_choice):
         )
         submit_button.click()
 
+        pages = 0
         while True:
-            if not process_page(driver, class_list):
+            try:
+                process_page(driver, on_page, ge_choice)
+            except TimeoutException:
+                # Only the first page may have no rows: the search found nothing
+                if pages:
+                    raise
+                print(f"No {ge_choice} sections found")
+                return
+            pages += 1
+            # The page is loaded by now, so a missing link means this was the
+            # last page; waiting for it would add 5 s to every category
+            if not driver.find_elements(By.XPATH, NEXT_XPATH):
                 break
 
-            try:
-                next_button = WebDriverWait(driver, 5).until(
-                    EC.element_to_be_clickable((By.XPATH, "//a[contains(@onclick, 'next')]"))
-                )
-                next_button.click()
-            except Exception:
-                break  
-
-    except Exception as e:
-        print(f"An error occurred while scraping {ge_choice}: {e}")
+            # The link is there, so failing to follow it is an error, not the end
+            WebDriverWait(driver, 5).until(
+                EC.element_to_be_clickable((By.XPATH, NEXT_XPATH))
+            ).click()
+
+    except WebDriverException:
+        broken = not driver_manager.is_alive(driver)
+        raise
     finally:
-        driver_manager.return_driver(driver)
+        driver_manager.return_driver(driver, broken)
+
+SCRAPER_ENGINES = {
+    "http": (pisa_http.scrape_course_pages, pisa_http.session_pool.size),
+    "selenium": (scrape_course_pages, driver_manager.max_drivers),
+}
+# "http" submits the class search form directly; "selenium" drives a remote browser
+SCRAPER_ENGINE = os.environ.get("SCRAPER_ENGINE", "http")
+
+def stream_courses(ge_choices, write, engine=None, term=None, name="scrape"):
+    # Scrapes the categories concurrently and hands each one to write(ge, courses)
+    # as soon as its last page is in. Returns (results, errors) keyed by category.
+    # The scraper threads are named name_0, name_1, ...
+    engine = engine or SCRAPER_ENGINE
+    scrape_pages, max_workers = SCRAPER_ENGINES[engine]
+    if term is not None:
+        scrape_pages = functools.partial(scrape_pages, term=term)
+    pipeline = CoursePipeline(write, name=name)
+    results, errors = pipeline.run(scrape_pages, ge_choices, max_workers)
+
+    # Sessions stay warm in the pool for the next refresh cycle
+    if engine == "selenium":
+        print(f"WebDriver pool: {driver_manager.stats()}")
+    return results, errors
+
+def get_courses(ge_choices, engine=None, term=None):
+    all_courses = []
 
-    return class_list
+    def collect(ge, courses):
+        all_courses.extend(courses)
+        print(f"Finished scraping {ge} courses. Total courses: {len(courses)}")
 
-def get_courses(ge_choices):
-    all_courses = []
-    max_retries = 3
-    retry_delay = 5  # seconds
-
-    with concurrent.futures.ThreadPoolExecutor(max_workers=driver_manager.max_drivers) as executor:
-        future_to_ge = {executor.submit(scrape_courses, ge): ge for ge in ge_choices}
-        for future in concurrent.futures.as_completed(future_to_ge):
-            ge = future_to_ge[future]
-            for attempt in range(max_retries):
-                try:
-                    courses = future.result()
-                    all_courses.extend(courses)
-                    print(f"Finished scraping {ge} courses. Total courses: {len(courses)}")
-                    break
-                except Exception as exc:
-                    print(f'{ge} generated an exception on attempt {attempt + 1}: {exc}')
-                    if attempt < max_retries - 1:
-                        print(f"Retrying {ge} in {retry_delay} seconds...")
-                        time.sleep(retry_delay)
-                    else:
-                        print(f"Failed to scrape {ge} after {max_retries} attempts.")
-
-    driver_manager.close_all()
+    stream_courses(ge_choices, collect, engine, term)
     return all_courses
 
 if __name__ == "__main__":
     ge_choices = ["CC", "ER", "IM", "MF", "SI", "SR", "TA", "PE-E", "PE-H", "PE-T", "PR-E", "PR-C", "PR-S", "C1", "C2"]
-    courses = get_courses(ge_choices)
+    courses = get_courses(ge_choices, engine=sys.argv[1] if len(sys.argv) > 1 else None)
     print(f"Total courses scraped: {len(courses)}")
\ No newline at end of file
@@ -62,6 +62,7 @@ export const SEARCH_API_URL =
   "https://my.ucsc.edu/PSIGW/RESTListeningConnector/PSFT_CSPRD/SCX_CLASS_LIST.v1";
 export const MAJOR_API_URL = `${current_url}/api/courses`;
 export const DEGREE_API_URL = `${current_url}/api/degrees`
+export const TERMS_URL = `${current_url}/api/terms`;
 export interface Course {
   code: string;
   link: string;